@@ -2,7 +2,7 @@ import os
 import io
 from flask import Flask, render_template, request, send_file
 from utils import read_file, write_file
-from crypto import aes, des, tripledes, rsa
+from crypto import registry
 
 app = Flask(__name__)
 
@@ -12,6 +12,9 @@ app = Flask(__name__)
 OUTPUT_DIR = "outputs"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Mức nén khi chọn "nén trước khi mã hóa" (1..9 zlib, 10..19 lzma)
+COMPRESS_LEVEL = int(os.environ.get("CRYPTO_COMPRESS_LEVEL", "6"))
+
 
 @app.route("/", methods=["GET", "POST"])
 def index():
@@ -26,6 +29,7 @@ def index():
     algorithm = request.form.get("algorithm")
     action = request.form.get("action")
     key = request.form.get("key")
+    compress = request.form.get("compress") == "1"
 
     if not input_file or not output_filename:
         return render_template(
@@ -48,25 +52,13 @@ def index():
     # XỬ LÝ THEO THUẬT TOÁN
     # =============================
     try:
-        if algorithm == "aes":
-            if action == "encrypt":
-                result = aes.encrypt(data, key)
-            elif action == "decrypt":
-                result = aes.decrypt(data, key)
-            else:
-                raise ValueError("Action không hợp lệ")
-
-        elif algorithm == "des":
-            result = des.encrypt(data, key) if action == "encrypt" else des.decrypt(data, key)
-
-        elif algorithm == "tripledes":
-            result = tripledes.encrypt(data, key) if action == "encrypt" else tripledes.decrypt(data, key)
-
-        elif algorithm == "rsa":
-            result = rsa.encrypt(data) if action == "encrypt" else rsa.decrypt(data)
-
+        if action == "encrypt":
+            result = registry.encrypt(algorithm, data, key,
+                                      compress=COMPRESS_LEVEL if compress else 0)
+        elif action == "decrypt":
+            result = registry.decrypt(algorithm, data, key, decompress=compress)
         else:
-            raise ValueError("Thuật toán chưa được hỗ trợ")
+            raise ValueError("Action không hợp lệ")
 
     except Exception as e:
         return render_template(
@@ -80,7 +72,7 @@ def index():
     try:
         # Lưu file trong folder outputs
         output_path = os.path.join(OUTPUT_DIR, output_filename)
-        write_file(output_path, result)
+        write_file(output_path, result, manifest=True)
 
         # Trả file trực tiếp về browser
         return send_file(
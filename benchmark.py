@@ -0,0 +1,285 @@
+# benchmark.py
+# =====================================================
+# BENCHMARK THÔNG LƯỢNG CÁC THUẬT TOÁN / ENGINE / CHẾ ĐỘ
+# =====================================================
+# Đo MB/s và độ trễ mỗi lần gọi cho AES, DES, TripleDES (mọi engine, mọi
+# chế độ trong crypto.registry), RSA sách giáo khoa, RSA_OAEP, chi phí
+# tạo khóa, padding và toàn bộ request qua app.py (Flask test client).
+#
+#   python benchmark.py --max-size 1048576 --out bench.json
+#   python benchmark.py --baseline bench.json --threshold 0.2
+#
+# Kết quả lưu JSON; so sánh với baseline, báo các ca chậm hơn ngưỡng.
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+from crypto import registry, modes  # noqa: E402
+
+
+DEFAULT_SIZES = [16, 256, 4096, 65536, 1 << 20, 16 << 20, 256 << 20]
+
+
+# -----------------------------
+# ĐO THỜI GIAN
+# -----------------------------
+
+def measure(fn, min_time=0.2, max_repeats=50):
+    """
+    Gọi fn lặp lại tới khi đủ min_time giây (ít nhất 1 lần)
+    Trả về (thời gian tốt nhất, thời gian trung bình, số lần)
+    """
+    times = []
+    total = 0.0
+    while not times or (total < min_time and len(times) < max_repeats):
+        t = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t
+        times.append(elapsed)
+        total += elapsed
+    return min(times), total / len(times), len(times)
+
+
+class Bench:
+    def __init__(self, min_time):
+        self.min_time = min_time
+        self.results = []
+
+    def run(self, case_id, size, fn, **info):
+        try:
+            best, mean, repeats = measure(fn, self.min_time)
+        except Exception as e:
+            row = {"id": case_id, "size": size, "error": f"{type(e).__name__}: {e}", **info}
+            print(f"  {case_id:<55} LỖI: {row['error']}")
+        else:
+            row = {
+                "id": case_id,
+                "size": size,
+                "seconds": best,
+                "mean_seconds": mean,
+                "repeats": repeats,
+                "mbps": size / best / 1e6 if size and best else None,
+                **info,
+            }
+            rate = f"{row['mbps']:10.3f} MB/s" if row["mbps"] is not None else " " * 15
+            print(f"  {case_id:<55} {best * 1e3:11.3f} ms {rate}")
+        self.results.append(row)
+        return row
+
+
+# -----------------------------
+# CÁC NHÓM BENCHMARK
+# -----------------------------
+
+def bench_ciphers(bench, sizes, reference_max, modes_filter):
+    print("Block cipher / chế độ")
+    for name in ("aes", "des", "tripledes", "aes-ctr", "aes-gcm", "aes-xts"):
+        alg = registry.get(name)
+        for engine in alg.engines.values():
+            if not engine.available():
+                continue
+            key = os.urandom(engine.key_sizes[0])
+            bench.run(f"{name}/{engine.name}/keysetup", 0, lambda: engine.factory(key),
+                      algorithm=name, engine=engine.name, op="keysetup")
+            for mode in engine.modes:
+                if modes_filter and mode not in modes_filter and mode != engine.modes[0]:
+                    continue
+                for size in sizes:
+                    if engine.reference and size > reference_max:
+                        continue
+                    data = os.urandom(size)
+                    if name == "aes-xts" and size < 16:
+                        continue            # XTS cần ít nhất một khối
+                    ct = registry.encrypt(name, data, key, mode, engine.name)
+                    for op, payload in (("encrypt", data), ("decrypt", ct)):
+                        fn = getattr(registry, op)
+                        bench.run(
+                            f"{name}/{engine.name}/{mode}/{op}/{size}", size,
+                            lambda fn=fn, payload=payload: fn(name, payload, key, mode, engine.name),
+                            algorithm=name, engine=engine.name, mode=mode, op=op,
+                        )
+
+
+def bench_padding(bench, sizes):
+    print("Padding PKCS#7")
+    for size in sizes:
+        data = os.urandom(size)
+        bench.run(f"padding/pkcs7/{size}", size, lambda: modes.pad(data, 16), op="padding")
+
+
+def bench_rsa(bench, sizes, rsa_bits, rsa_max):
+    print("RSA")
+    from crypto.rsa import RSA
+    from crypto.rsa_oaep import RSA_OAEP
+
+    # RSA.encrypt trả về bytes() của các giá trị mod n = 3233 → luôn
+    # ValueError; đo trực tiếp vòng lặp pow từng byte mà nó thực hiện
+    textbook = RSA()
+    e, d, n = textbook.e, textbook.d, textbook.n
+    for size in sizes:
+        if size > rsa_max:
+            continue
+        data = os.urandom(size)
+        ct = [pow(b, e, n) for b in data]
+        bench.run(f"rsa-textbook/encrypt/{size}", size, lambda: [pow(b, e, n) for b in data],
+                  algorithm="rsa-textbook", op="encrypt", path="pow-loop")
+        bench.run(f"rsa-textbook/decrypt/{size}", size, lambda: [pow(c, d, n) for c in ct],
+                  algorithm="rsa-textbook", op="decrypt", path="pow-loop")
+
+    oaep = RSA_OAEP(key_size=rsa_bits)
+    bench.run(f"rsa-oaep/keygen/{rsa_bits}", 0, oaep.generate_keys,
+              algorithm="rsa-oaep", op="keygen", bits=rsa_bits)
+    for size in sizes:
+        if size > rsa_max:
+            continue
+        data = os.urandom(size)
+        ct = oaep.encrypt(data)
+        bench.run(f"rsa-oaep/encrypt/{size}", size, lambda: oaep.encrypt(data),
+                  algorithm="rsa-oaep", op="encrypt", bits=rsa_bits)
+        bench.run(f"rsa-oaep/decrypt/{size}", size, lambda: oaep.decrypt(ct),
+                  algorithm="rsa-oaep", op="decrypt", bits=rsa_bits)
+
+
+def bench_app(bench, sizes, app_max):
+    print("Request qua app.py (Flask test client)")
+    try:
+        import app as web
+    except ImportError as e:
+        print(f"  bỏ qua: {e}")
+        return
+    client = web.app.test_client()
+    keys = {"aes": "0123456789abcdef", "des": "abcdefgh", "3des": "0123456789abcdef01234567"}
+    for alg, key in keys.items():
+        for size in sizes:
+            if size > app_max:
+                continue
+            data = os.urandom(size)
+
+            def post(payload, action):
+                r = client.post("/", data={
+                    "input_file": (io.BytesIO(payload), "input.bin"),
+                    "output_file": "bench.bin",
+                    "algorithm": alg,
+                    "action": action,
+                    "key": key,
+                }, content_type="multipart/form-data")
+                if r.status_code != 200 or r.mimetype != "application/octet-stream":
+                    raise RuntimeError("request thất bại")
+                return r.data
+
+            ct = post(data, "encrypt")
+            for action, payload in (("encrypt", data), ("decrypt", ct)):
+                bench.run(f"app/{alg}/{action}/{size}", size,
+                          lambda payload=payload, action=action: post(payload, action),
+                          algorithm=alg, op=action, path="app")
+
+
+# -----------------------------
+# SO SÁNH BASELINE
+# -----------------------------
+
+def compare(results, baseline, threshold):
+    old = {r["id"]: r for r in baseline["results"] if "seconds" in r}
+    regressions = []
+    print(f"\nSo sánh với baseline (ngưỡng +{threshold:.0%})")
+    for r in results:
+        if "seconds" not in r or r["id"] not in old:
+            continue
+        before = old[r["id"]]["seconds"]
+        ratio = r["seconds"] / before if before else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append({"id": r["id"], "before": before, "after": r["seconds"], "ratio": ratio})
+            flag = "  ← CHẬM HƠN"
+        print(f"  {r['id']:<55} x{ratio:6.2f}{flag}")
+    print(f"{len(regressions)} ca chậm hơn ngưỡng")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark các thuật toán mã hóa")
+    parser.add_argument("--sizes", type=int, nargs="*", default=DEFAULT_SIZES)
+    parser.add_argument("--max-size", type=int, default=1 << 20,
+                        help="bỏ qua kích thước lớn hơn (mặc định 1 MB; 256 MB rất chậm)")
+    parser.add_argument("--reference-max", type=int, default=4096,
+                        help="kích thước lớn nhất cho engine tham chiếu")
+    parser.add_argument("--modes", nargs="*", help="chỉ đo các chế độ này (ECB luôn đo)")
+    parser.add_argument("--rsa-bits", type=int, default=1024)
+    parser.add_argument("--rsa-max", type=int, default=65536)
+    parser.add_argument("--app-max", type=int, default=1 << 20)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--skip", nargs="*", default=[],
+                        choices=["ciphers", "padding", "rsa", "app"])
+    parser.add_argument("--out", help="ghi kết quả JSON")
+    parser.add_argument("--baseline", help="file JSON baseline để so sánh")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="tỉ lệ chậm hơn cho phép (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    # OAEP-SHA256 cần k - 2*32 - 2 >= 1 byte dữ liệu mỗi khối
+    if args.rsa_bits < 8 * 67:
+        parser.error("--rsa-bits quá nhỏ cho OAEP-SHA256 (tối thiểu 536)")
+
+    sizes = [s for s in args.sizes if s <= args.max_size]
+    out_path = os.path.abspath(args.out) if args.out else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    # app.py / RSA_OAEP ghi outputs/ và keys/ theo thư mục hiện tại
+    # → chạy trong thư mục tạm để không đụng dữ liệu thật
+    workdir = tempfile.mkdtemp(prefix="crypto-bench-")
+    os.chdir(workdir)
+    os.environ.setdefault("CRYPTO_AUTOTUNE", "0")
+
+    bench = Bench(args.min_time)
+    if "ciphers" not in args.skip:
+        bench_ciphers(bench, sizes, args.reference_max, args.modes)
+    if "padding" not in args.skip:
+        bench_padding(bench, sizes)
+    if "rsa" not in args.skip:
+        bench_rsa(bench, sizes, args.rsa_bits, args.rsa_max)
+    if "app" not in args.skip:
+        bench_app(bench, sizes, args.app_max)
+
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": numpy_version,
+            "min_time": args.min_time,
+        },
+        "results": bench.results,
+    }
+
+    status = 0
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        report["regressions"] = compare(bench.results, baseline, args.threshold)
+        status = 1 if report["regressions"] else 0
+
+    if out_path:
+        with open(out_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Đã ghi {out_path}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
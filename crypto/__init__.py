@@ -2,10 +2,32 @@
 # =====================================================
 # File này dùng để khai báo package crypto
 # Giúp các file khác import AES, DES, 3DES, RSA
+# Các lớp được import lười (chỉ khi dùng tới) để khởi động nhanh
 # =====================================================
 
-from .aes import AES
-from .des import DES
-from .tripledes import TripleDES
-from .rsa import RSA
-from .rsa_oaep import RSA_OAEP
+import importlib
+import os
+
+_LAZY = {
+    "AES": "crypto.aes",
+    "DES": "crypto.des",
+    "TripleDES": "crypto.tripledes",
+    "RSA": "crypto.rsa",
+    "RSA_OAEP": "crypto.rsa_oaep",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module 'crypto' has no attribute '{name}'")
+
+
+# Profiling theo primitive: CRYPTO_PROFILE=1 (xem crypto/profiling.py)
+if os.environ.get("CRYPTO_PROFILE", "0") not in ("", "0"):
+    from . import profiling as _profiling
+    _profiling._enable_from_env(os.environ.get("CRYPTO_PROFILE_OUT"))
@@ -1,4 +1,14 @@
 from copy import deepcopy
+import struct
+
+from .streaming import Encryptor, Decryptor
+from .buffers import BufferMixin
+from .keycache import cached_cipher
+
+try:
+    import numpy as np
+except ImportError:  # NumPy là tùy chọn – chỉ engine AESNumpy cần
+    np = None
 
 # -----------------------------
 # S-BOX & INV S-BOX
@@ -120,6 +130,11 @@ def matrix2bytes(m):
     )
 
 
+_BLOCK = struct.Struct(">4I")
+_unpack_block = _BLOCK.unpack
+_pack_block = _BLOCK.pack
+
+
 def pad(data, block_size=16):
     pad_len = block_size - (len(data) % block_size)
     return data + bytes([pad_len] * pad_len)
@@ -139,13 +154,15 @@ def unpad(data):
 # -----------------------------
 # AES CLASS
 # -----------------------------
-class AES:
+class AES(BufferMixin):
     """
     AES-128 Block Cipher
     - Key size: 128-bit
     - Block size: 128-bit
     - Mode: ECB (demo)
     """
+    block_size = 16
+
     def __init__(self, key: bytes):
         if len(key) != 16:
             raise ValueError("AES-128 key must be 16 bytes")
@@ -177,18 +194,262 @@ class AES:
         state = add_round_key(state, self.round_keys[0])
         return matrix2bytes(state)
 
+    def encrypt_blocks(self, data: bytes) -> bytes:
+        """
+        ECB thô (không padding) – len(data) phải là bội số 16
+        """
+        return b"".join(self.encrypt_block(data[i:i+16]) for i in range(0, len(data), 16))
+
+    def decrypt_blocks(self, data: bytes) -> bytes:
+        return b"".join(self.decrypt_block(data[i:i+16]) for i in range(0, len(data), 16))
+
     def encrypt(self, data: bytes) -> bytes:
         data = pad(data, 16)
-        result = b"".join(self.encrypt_block(data[i:i+16]) for i in range(0, len(data), 16))
-        return result
+        return self.encrypt_blocks(data)
 
     def decrypt(self, data: bytes) -> bytes:
         if len(data) % 16 != 0:
             raise ValueError("Dữ liệu không phải bội số 16 bytes")
-        result = b"".join(self.decrypt_block(data[i:i+16]) for i in range(0, len(data), 16))
-        return unpad(result)
-    
-    # =================================================
+        return unpad(self.decrypt_blocks(data))
+
+    def encryptor(self) -> Encryptor:
+        """Ngữ cảnh mã hóa dạng luồng (update/finalize)"""
+        return Encryptor(self)
+
+    def decryptor(self) -> Decryptor:
+        """Ngữ cảnh giải mã dạng luồng (update/finalize)"""
+        return Decryptor(self)
+
+
+# -----------------------------
+# T-TABLES (SubBytes + ShiftRows + MixColumns gộp thành tra bảng 32-bit)
+# -----------------------------
+def _mul(a, b):
+    """
+    Nhân hai phần tử trong GF(2^8)
+    """
+    r = 0
+    while b:
+        if b & 1:
+            r ^= a
+        a = xtime(a)
+        b >>= 1
+    return r
+
+
+def _ror8(w):
+    return ((w >> 8) | (w << 24)) & 0xFFFFFFFF
+
+
+_SboxFlat = [Sbox[b >> 4][b & 0x0F] for b in range(256)]
+
+Te0 = []
+Td0 = []
+for _x in range(256):
+    _s = _SboxFlat[_x]
+    Te0.append((_mul(_s, 2) << 24) | (_s << 16) | (_s << 8) | _mul(_s, 3))
+    _s = InvSbox[_x]
+    Td0.append((_mul(_s, 14) << 24) | (_mul(_s, 9) << 16) | (_mul(_s, 13) << 8) | _mul(_s, 11))
+Te1 = [_ror8(w) for w in Te0]
+Te2 = [_ror8(w) for w in Te1]
+Te3 = [_ror8(w) for w in Te2]
+Td1 = [_ror8(w) for w in Td0]
+Td2 = [_ror8(w) for w in Td1]
+Td3 = [_ror8(w) for w in Td2]
+del _x, _s
+
+
+def _round_key_words(rk):
+    """
+    Chuyển 1 round key (dạng [hàng][cột] như add_round_key dùng)
+    thành 4 word 32-bit theo cột
+    """
+    return [
+        (rk[0][c] << 24) | (rk[1][c] << 16) | (rk[2][c] << 8) | rk[3][c]
+        for c in range(4)
+    ]
+
+
+def _inv_mix_word(w):
+    """
+    InvMixColumns trên 1 cột 32-bit (dùng cho khóa giải mã tương đương)
+    """
+    S = _SboxFlat
+    return (Td0[S[w >> 24]] ^ Td1[S[(w >> 16) & 0xFF]]
+            ^ Td2[S[(w >> 8) & 0xFF]] ^ Td3[S[w & 0xFF]])
+
+
+class AESTTable(AES):
+    """
+    AES-128 dùng T-table
+    - Mỗi vòng = 16 lần tra bảng 32-bit + XOR
+    - Giải mã theo "equivalent inverse cipher" (khóa giải mã đã qua InvMixColumns)
+    - Kết quả giống hệt lớp AES gốc
+    """
+    def __init__(self, key: bytes):
+        super().__init__(key)
+        ek = []
+        for rk in self.round_keys:
+            ek.extend(_round_key_words(rk))
+        dk = ek[40:44]
+        for r in range(9, 0, -1):
+            dk.extend(_inv_mix_word(w) for w in ek[4 * r:4 * r + 4])
+        dk.extend(ek[0:4])
+        self._ek = ek
+        self._dk = dk
+
+    def encrypt_block(self, plaintext: bytes) -> bytes:
+        T0, T1, T2, T3, S, rk = Te0, Te1, Te2, Te3, _SboxFlat, self._ek
+        s0, s1, s2, s3 = _unpack_block(plaintext)
+        s0 ^= rk[0]; s1 ^= rk[1]; s2 ^= rk[2]; s3 ^= rk[3]
+        for i in range(4, 40, 4):
+            t0 = T0[s0 >> 24] ^ T1[(s1 >> 16) & 0xFF] ^ T2[(s2 >> 8) & 0xFF] ^ T3[s3 & 0xFF] ^ rk[i]
+            t1 = T0[s1 >> 24] ^ T1[(s2 >> 16) & 0xFF] ^ T2[(s3 >> 8) & 0xFF] ^ T3[s0 & 0xFF] ^ rk[i + 1]
+            t2 = T0[s2 >> 24] ^ T1[(s3 >> 16) & 0xFF] ^ T2[(s0 >> 8) & 0xFF] ^ T3[s1 & 0xFF] ^ rk[i + 2]
+            t3 = T0[s3 >> 24] ^ T1[(s0 >> 16) & 0xFF] ^ T2[(s1 >> 8) & 0xFF] ^ T3[s2 & 0xFF] ^ rk[i + 3]
+            s0, s1, s2, s3 = t0, t1, t2, t3
+        return _pack_block(
+            ((S[s0 >> 24] << 24) | (S[(s1 >> 16) & 0xFF] << 16) | (S[(s2 >> 8) & 0xFF] << 8) | S[s3 & 0xFF]) ^ rk[40],
+            ((S[s1 >> 24] << 24) | (S[(s2 >> 16) & 0xFF] << 16) | (S[(s3 >> 8) & 0xFF] << 8) | S[s0 & 0xFF]) ^ rk[41],
+            ((S[s2 >> 24] << 24) | (S[(s3 >> 16) & 0xFF] << 16) | (S[(s0 >> 8) & 0xFF] << 8) | S[s1 & 0xFF]) ^ rk[42],
+            ((S[s3 >> 24] << 24) | (S[(s0 >> 16) & 0xFF] << 16) | (S[(s1 >> 8) & 0xFF] << 8) | S[s2 & 0xFF]) ^ rk[43],
+        )
+
+    def decrypt_block(self, ciphertext: bytes) -> bytes:
+        T0, T1, T2, T3, S, rk = Td0, Td1, Td2, Td3, InvSbox, self._dk
+        s0, s1, s2, s3 = _unpack_block(ciphertext)
+        s0 ^= rk[0]; s1 ^= rk[1]; s2 ^= rk[2]; s3 ^= rk[3]
+        for i in range(4, 40, 4):
+            t0 = T0[s0 >> 24] ^ T1[(s3 >> 16) & 0xFF] ^ T2[(s2 >> 8) & 0xFF] ^ T3[s1 & 0xFF] ^ rk[i]
+            t1 = T0[s1 >> 24] ^ T1[(s0 >> 16) & 0xFF] ^ T2[(s3 >> 8) & 0xFF] ^ T3[s2 & 0xFF] ^ rk[i + 1]
+            t2 = T0[s2 >> 24] ^ T1[(s1 >> 16) & 0xFF] ^ T2[(s0 >> 8) & 0xFF] ^ T3[s3 & 0xFF] ^ rk[i + 2]
+            t3 = T0[s3 >> 24] ^ T1[(s2 >> 16) & 0xFF] ^ T2[(s1 >> 8) & 0xFF] ^ T3[s0 & 0xFF] ^ rk[i + 3]
+            s0, s1, s2, s3 = t0, t1, t2, t3
+        return _pack_block(
+            ((S[s0 >> 24] << 24) | (S[(s3 >> 16) & 0xFF] << 16) | (S[(s2 >> 8) & 0xFF] << 8) | S[s1 & 0xFF]) ^ rk[40],
+            ((S[s1 >> 24] << 24) | (S[(s0 >> 16) & 0xFF] << 16) | (S[(s3 >> 8) & 0xFF] << 8) | S[s2 & 0xFF]) ^ rk[41],
+            ((S[s2 >> 24] << 24) | (S[(s1 >> 16) & 0xFF] << 16) | (S[(s0 >> 8) & 0xFF] << 8) | S[s3 & 0xFF]) ^ rk[42],
+            ((S[s3 >> 24] << 24) | (S[(s2 >> 16) & 0xFF] << 16) | (S[(s1 >> 8) & 0xFF] << 8) | S[s0 & 0xFF]) ^ rk[43],
+        )
+
+
+# -----------------------------
+# NUMPY ENGINE (mã hóa hàng nghìn khối trong 1 lần gọi)
+# -----------------------------
+# Vị trí byte trong khối: i = row + 4 * col (column-major như bytes2matrix)
+_SHIFT_ROWS_IDX = [0] * 16
+for _c in range(4):
+    for _r in range(4):
+        _SHIFT_ROWS_IDX[_r + 4 * _c] = _r + 4 * ((_c + _r) % 4)
+_INV_SHIFT_ROWS_IDX = [0] * 16
+for _i, _j in enumerate(_SHIFT_ROWS_IDX):
+    _INV_SHIFT_ROWS_IDX[_j] = _i
+del _c, _r, _i, _j
+
+
+class AESNumpy(AESTTable):
+    """
+    AES-128 ECB vector hóa bằng NumPy
+    - Toàn bộ buffer được xem như mảng (N, 16) uint8
+    - Mỗi vòng chạy trên tất cả các khối cùng lúc
+      (S-box và xtime là bảng tra fancy-index)
+    - encrypt_block/decrypt_block (1 khối) vẫn dùng T-table
+    """
+    # Số khối xử lý mỗi lượt, giới hạn bộ nhớ tạm
+    batch_blocks = 1 << 16
+
+    def __init__(self, key: bytes):
+        if np is None:
+            raise ImportError("AESNumpy cần cài đặt numpy")
+        super().__init__(key)
+        self._np_round_keys = np.array(
+            [[rk[i % 4][i // 4] for i in range(16)] for rk in self.round_keys],
+            dtype=np.uint8,
+        )
+        self._np_sbox = np.array(_SboxFlat, dtype=np.uint8)
+        self._np_inv_sbox = np.array(InvSbox, dtype=np.uint8)
+        self._np_xtime = np.array([xtime(x) for x in range(256)], dtype=np.uint8)
+        self._np_shift = np.array(_SHIFT_ROWS_IDX)
+        self._np_inv_shift = np.array(_INV_SHIFT_ROWS_IDX)
+
+    def _mix_columns(self, state):
+        a = state.reshape(-1, 4, 4)
+        t = a[:, :, 0] ^ a[:, :, 1] ^ a[:, :, 2] ^ a[:, :, 3]
+        a = a ^ t[:, :, None] ^ self._np_xtime[a ^ np.roll(a, -1, axis=2)]
+        return a.reshape(-1, 16)
+
+    def _inv_mix_columns(self, state):
+        X = self._np_xtime
+        a = state.reshape(-1, 4, 4).copy()
+        u = X[X[a[:, :, 0] ^ a[:, :, 2]]]
+        v = X[X[a[:, :, 1] ^ a[:, :, 3]]]
+        a[:, :, 0] ^= u
+        a[:, :, 1] ^= v
+        a[:, :, 2] ^= u
+        a[:, :, 3] ^= v
+        return self._mix_columns(a.reshape(-1, 16))
+
+    def _encrypt_array(self, state):
+        S, K, shift = self._np_sbox, self._np_round_keys, self._np_shift
+        state = state ^ K[0]
+        for r in range(1, 10):
+            state = S[state[:, shift]]
+            state = self._mix_columns(state)
+            state ^= K[r]
+        state = S[state[:, shift]]
+        state ^= K[10]
+        return state
+
+    def _decrypt_array(self, state):
+        S, K, shift = self._np_inv_sbox, self._np_round_keys, self._np_inv_shift
+        state = state ^ K[10]
+        state = S[state[:, shift]]
+        for r in range(9, 0, -1):
+            state ^= K[r]
+            state = self._inv_mix_columns(state)
+            state = S[state[:, shift]]
+        state ^= K[0]
+        return state
+
+    def _run_into(self, fn, src, dst):
+        if len(src) % 16 != 0:
+            raise ValueError("Dữ liệu không phải bội số 16 bytes")
+        if not len(src):
+            return
+        blocks = np.frombuffer(src, dtype=np.uint8).reshape(-1, 16)
+        out = np.frombuffer(dst, dtype=np.uint8).reshape(-1, 16)
+        step = self.batch_blocks
+        for i in range(0, len(blocks), step):
+            out[i:i + step] = fn(blocks[i:i + step])
+
+    def encrypt_blocks_into(self, src, dst):
+        self._run_into(self._encrypt_array, src, dst)
+
+    def decrypt_blocks_into(self, src, dst):
+        self._run_into(self._decrypt_array, src, dst)
+
+    def encrypt_blocks(self, data: bytes) -> bytes:
+        out = bytearray(len(data))
+        self._run_into(self._encrypt_array, data, out)
+        return bytes(out)
+
+    def decrypt_blocks(self, data: bytes) -> bytes:
+        out = bytearray(len(data))
+        self._run_into(self._decrypt_array, data, out)
+        return bytes(out)
+
+
+# Từ kích thước này trở lên, engine NumPy nhanh hơn T-table
+NUMPY_THRESHOLD = 4096
+
+
+def _engine_for(data):
+    if np is not None and len(data) >= NUMPY_THRESHOLD:
+        return AESNumpy
+    return AESTTable
+
+
+# =================================================
 # MODULE-LEVEL API (PHÙ HỢP app.py)
 # =================================================
 
@@ -202,8 +463,8 @@ def encrypt(data: bytes, key: str) -> bytes:
     if len(key) != 16:
         raise ValueError("AES-128 yêu cầu key đúng 16 bytes")
 
-    cipher = AES(key)
-    return cipher.encrypt(data)
+    with cached_cipher(_engine_for(data), key) as cipher:
+        return cipher.encrypt(data)
 
 
 def decrypt(data: bytes, key: str) -> bytes:
@@ -216,6 +477,6 @@ def decrypt(data: bytes, key: str) -> bytes:
     if len(key) != 16:
         raise ValueError("AES-128 yêu cầu key đúng 16 bytes")
 
-    cipher = AES(key)
-    return cipher.decrypt(data)
+    with cached_cipher(_engine_for(data), key) as cipher:
+        return cipher.decrypt(data)
 
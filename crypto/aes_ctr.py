@@ -0,0 +1,176 @@
+# =====================================================
+# AES-CTR (COUNTER MODE)
+# Demo học thuật – KHÔNG dùng cho bảo mật thực tế
+# =====================================================
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .aes import AESTTable, AESNumpy, np
+
+
+NONCE_SIZE = 8      # 64-bit nonce
+BLOCK_SIZE = 16
+
+
+def _xor_bytes(a, b):
+    """XOR hai chuỗi bytes cùng độ dài (qua số nguyên lớn – nhanh hơn zip)"""
+    n = len(a)
+    return (int.from_bytes(a, "big") ^ int.from_bytes(b, "big")).to_bytes(n, "big")
+
+
+def _make_cipher(key):
+    return AESNumpy(key) if np is not None else AESTTable(key)
+
+
+def _counter_blocks(nonce, start, count):
+    return b"".join(nonce + i.to_bytes(8, "big") for i in range(start, start + count))
+
+
+def _keystream_segment(args):
+    """
+    Hàm chạy trong process con: sinh keystream cho các khối [start, start + count)
+    """
+    key, nonce, start, count = args
+    return _make_cipher(key).encrypt_blocks(_counter_blocks(nonce, start, count))
+
+
+class AESCTR:
+    """
+    AES-128 chế độ CTR
+    ----------------------------------------
+    Khối đếm = nonce (8 byte) || counter (8 byte, big-endian)
+        C_i = P_i XOR E(K, nonce || i)
+
+    - Không cần padding
+    - Mỗi khối keystream độc lập → sinh được tại bất kỳ offset nào
+      và chia được cho nhiều process
+    - Không truyền nonce: mỗi lần encrypt() dùng một nonce mới
+      (self.nonce = nonce của lần encrypt gần nhất). Truyền nonce: chỉ
+      được encrypt() một lần – lần thứ hai sẽ dùng lại keystream.
+    """
+
+    # Dưới ngưỡng này (số khối) không chia process – chi phí pool lớn hơn lợi ích
+    parallel_threshold = 1 << 14
+
+    def __init__(self, key: bytes, nonce: bytes = None, workers: int = 1):
+        if len(key) != 16:
+            raise ValueError("AES-128 key must be 16 bytes")
+        self._nonce_fixed = nonce is not None
+        if nonce is None:
+            nonce = os.urandom(NONCE_SIZE)
+        if len(nonce) != NONCE_SIZE:
+            raise ValueError(f"Nonce phải đúng {NONCE_SIZE} bytes")
+        self.key = key
+        self.nonce = nonce
+        self._nonce_used = False
+        self.workers = workers
+        self.cipher = _make_cipher(key)
+        self._pool = None
+
+    # -----------------------------
+    # POOL (giữ lại giữa các lần gọi, tạo khi cần)
+    # -----------------------------
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -----------------------------
+    # KEYSTREAM
+    # -----------------------------
+
+    def keystream(self, offset: int, length: int, nonce: bytes = None) -> bytes:
+        """
+        Sinh keystream cho vùng byte [offset, offset + length)
+        nonce: mặc định self.nonce
+        """
+        if length <= 0:
+            return b""
+        if nonce is None:
+            nonce = self.nonce
+        first = offset // BLOCK_SIZE
+        last = (offset + length - 1) // BLOCK_SIZE
+        count = last - first + 1
+
+        if self.workers > 1 and count >= self.parallel_threshold:
+            step = -(-count // self.workers)
+            segments = [
+                (self.key, nonce, s, min(step, first + count - s))
+                for s in range(first, first + count, step)
+            ]
+            stream = b"".join(self._get_pool().map(_keystream_segment, segments))
+        else:
+            stream = self.cipher.encrypt_blocks(_counter_blocks(nonce, first, count))
+
+        skip = offset - first * BLOCK_SIZE
+        return stream[skip:skip + length]
+
+    def process(self, data: bytes, offset: int = 0, nonce: bytes = None) -> bytes:
+        """
+        Mã hóa / giải mã (hai chiều giống nhau) dữ liệu bắt đầu tại byte offset
+        """
+        return _xor_bytes(data, self.keystream(offset, len(data), nonce))
+
+    def _next_nonce(self):
+        """Nonce cho một lần encrypt() – không bao giờ dùng lại"""
+        if self._nonce_used:
+            if self._nonce_fixed:
+                raise ValueError("Nonce do người gọi truyền vào chỉ dùng cho một lần encrypt()")
+            self.nonce = os.urandom(NONCE_SIZE)
+        self._nonce_used = True
+        return self.nonce
+
+    def encrypt(self, data: bytes) -> bytes:
+        """
+        Trả về nonce || ciphertext
+        """
+        nonce = self._next_nonce()
+        return nonce + self.process(data, nonce=nonce)
+
+    def decrypt(self, data: bytes) -> bytes:
+        """
+        Nhận nonce || ciphertext
+        Nonce đọc từ dữ liệu chỉ dùng cho lần giải mã này – self.nonce giữ
+        nguyên, để encrypt() sau đó không dùng lại nonce của bên gửi
+        """
+        if len(data) < NONCE_SIZE:
+            raise ValueError("Dữ liệu quá ngắn (thiếu nonce)")
+        return self.process(data[NONCE_SIZE:], nonce=data[:NONCE_SIZE])
+
+    def decrypt_at(self, data: bytes, offset: int, nonce: bytes = None) -> bytes:
+        """
+        Giải mã một đoạn ciphertext (không kèm nonce) bắt đầu tại byte offset
+        – không cần đọc các byte phía trước (nonce mặc định self.nonce)
+        """
+        return self.process(data, offset, nonce)
+
+
+# =================================================
+# MODULE-LEVEL API
+# =================================================
+
+def encrypt(data: bytes, key: str) -> bytes:
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+    return AESCTR(key).encrypt(data)
+
+
+def decrypt(data: bytes, key: str) -> bytes:
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+    if len(data) < NONCE_SIZE:
+        raise ValueError("Dữ liệu quá ngắn (thiếu nonce)")
+    return AESCTR(key, nonce=data[:NONCE_SIZE]).decrypt(data)
@@ -0,0 +1,182 @@
+# =====================================================
+# AES-GCM (GALOIS/COUNTER MODE) – MÃ HÓA CÓ XÁC THỰC
+# Demo học thuật – KHÔNG dùng cho bảo mật thực tế
+# =====================================================
+
+import os
+import hmac
+
+from .aes import AESTTable, AESNumpy, np
+from .keycache import cached_cipher
+
+
+IV_SIZE = 12        # 96-bit IV
+TAG_SIZE = 16       # 128-bit tag
+BLOCK_SIZE = 16
+
+_R = 0xE1 << 120    # đa thức rút gọn GF(2^128) theo thứ tự bit của GCM
+_MASK32 = 0xFFFFFFFF
+
+
+def _mulx(v):
+    """Nhân với x trong GF(2^128) (bit 0 là bit cao nhất)"""
+    return (v >> 1) ^ _R if v & 1 else v >> 1
+
+
+def _build_tables(h):
+    """
+    Bảng Shoup 8-bit: M[i][b] = (byte b đặt ở vị trí i) * H
+    → X * H = XOR của 16 lần tra bảng
+    """
+    powers = [h]
+    for _ in range(127):
+        powers.append(_mulx(powers[-1]))
+
+    tables = []
+    for i in range(16):
+        t = [0] * 256
+        base = powers[8 * i:8 * i + 8]
+        for j in range(8):
+            bit = 0x80 >> j
+            p = base[j]
+            for b in range(bit, 256, bit << 1):
+                for k in range(b, b + bit):
+                    t[k] ^= p
+        tables.append(t)
+    # Vị trí i = 0 là byte cao nhất của số nguyên big-endian
+    return tables
+
+
+def _ghash_tables(cipher):
+    """
+    Lấy (hoặc tạo rồi lưu) bảng GHASH gắn với key schedule của cipher
+    """
+    tables = getattr(cipher, "_gcm_tables", None)
+    if tables is None:
+        h = int.from_bytes(cipher.encrypt_block(bytes(16)), "big")
+        tables = _build_tables(h)
+        cipher._gcm_tables = tables
+    return tables
+
+
+def _ghash(tables, y, data):
+    """
+    Cập nhật GHASH y với data (đã đệm 0 tới bội số 16)
+    """
+    (M0, M1, M2, M3, M4, M5, M6, M7,
+     M8, M9, M10, M11, M12, M13, M14, M15) = tables
+    for i in range(0, len(data), BLOCK_SIZE):
+        x = y ^ int.from_bytes(data[i:i + BLOCK_SIZE], "big")
+        b = x.to_bytes(16, "big")
+        y = (M0[b[0]] ^ M1[b[1]] ^ M2[b[2]] ^ M3[b[3]]
+             ^ M4[b[4]] ^ M5[b[5]] ^ M6[b[6]] ^ M7[b[7]]
+             ^ M8[b[8]] ^ M9[b[9]] ^ M10[b[10]] ^ M11[b[11]]
+             ^ M12[b[12]] ^ M13[b[13]] ^ M14[b[14]] ^ M15[b[15]])
+    return y
+
+
+def _zero_pad(data):
+    r = len(data) % BLOCK_SIZE
+    return data + bytes(BLOCK_SIZE - r) if r else data
+
+
+def _xor_bytes(a, b):
+    n = len(a)
+    return (int.from_bytes(a, "big") ^ int.from_bytes(b[:n], "big")).to_bytes(n, "big")
+
+
+class AESGCM:
+    """
+    AES-128-GCM
+    ----------------------------------------
+        J0  = IV || 0^31 || 1
+        C   = CTR(K, inc32(J0), P)
+        S   = GHASH_H(A || 0* || C || 0* || len(A) || len(C))
+        Tag = E(K, J0) XOR S
+
+    - IV: 96-bit, tag: 128-bit, hỗ trợ AAD
+    - GHASH dùng bảng Shoup 8-bit tính sẵn theo khóa
+    """
+
+    def __init__(self, key: bytes, cipher=None):
+        if len(key) != 16:
+            raise ValueError("AES-128 key must be 16 bytes")
+        if cipher is None:
+            cipher = AESNumpy(key) if np is not None else AESTTable(key)
+        self.cipher = cipher
+        self._tables = _ghash_tables(cipher)
+
+    def _ctr(self, iv, data):
+        """CTR với inc32 bắt đầu từ counter = 2"""
+        n = -(-len(data) // BLOCK_SIZE)
+        blocks = b"".join(
+            iv + ((2 + i) & _MASK32).to_bytes(4, "big") for i in range(n)
+        )
+        return _xor_bytes(data, self.cipher.encrypt_blocks(blocks))
+
+    def _tag(self, iv, aad, ct):
+        y = _ghash(self._tables, 0, _zero_pad(aad))
+        y = _ghash(self._tables, y, _zero_pad(ct))
+        lengths = (len(aad) * 8).to_bytes(8, "big") + (len(ct) * 8).to_bytes(8, "big")
+        y = _ghash(self._tables, y, lengths)
+        ek = self.cipher.encrypt_block(iv + b"\x00\x00\x00\x01")
+        return (y ^ int.from_bytes(ek, "big")).to_bytes(16, "big")
+
+    def seal(self, iv: bytes, data: bytes, aad: bytes = b""):
+        """
+        Mã hóa + xác thực, trả về (ciphertext, tag)
+        """
+        if len(iv) != IV_SIZE:
+            raise ValueError(f"IV phải đúng {IV_SIZE} bytes")
+        ct = self._ctr(iv, data)
+        return ct, self._tag(iv, aad, ct)
+
+    def open(self, iv: bytes, ct: bytes, tag: bytes, aad: bytes = b"") -> bytes:
+        """
+        Kiểm tra tag rồi giải mã – sai tag thì báo lỗi, không trả plaintext
+        """
+        if len(iv) != IV_SIZE:
+            raise ValueError(f"IV phải đúng {IV_SIZE} bytes")
+        if not hmac.compare_digest(self._tag(iv, aad, ct), tag):
+            raise ValueError("Xác thực thất bại: dữ liệu bị sửa đổi hoặc sai khóa")
+        return self._ctr(iv, ct)
+
+    def encrypt(self, data: bytes, aad: bytes = b"") -> bytes:
+        """
+        Trả về IV || ciphertext || tag (IV ngẫu nhiên)
+        """
+        iv = os.urandom(IV_SIZE)
+        ct, tag = self.seal(iv, data, aad)
+        return iv + ct + tag
+
+    def decrypt(self, data: bytes, aad: bytes = b"") -> bytes:
+        """
+        Nhận IV || ciphertext || tag
+        """
+        if len(data) < IV_SIZE + TAG_SIZE:
+            raise ValueError("Dữ liệu quá ngắn")
+        return self.open(data[:IV_SIZE], data[IV_SIZE:-TAG_SIZE], data[-TAG_SIZE:], aad)
+
+
+# =================================================
+# MODULE-LEVEL API
+# =================================================
+
+def encrypt(data: bytes, key: str) -> bytes:
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+    if len(key) != 16:
+        raise ValueError("AES-128 key must be 16 bytes")
+    # Cipher trong cache giữ luôn bảng GHASH của khóa
+    with cached_cipher(AESNumpy if np is not None else AESTTable, key) as cipher:
+        return AESGCM(key, cipher=cipher).encrypt(data)
+
+
+def decrypt(data: bytes, key: str) -> bytes:
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+    if len(key) != 16:
+        raise ValueError("AES-128 key must be 16 bytes")
+    # Cipher trong cache giữ luôn bảng GHASH của khóa
+    with cached_cipher(AESNumpy if np is not None else AESTTable, key) as cipher:
+        return AESGCM(key, cipher=cipher).decrypt(data)
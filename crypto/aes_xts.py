@@ -0,0 +1,163 @@
+# =====================================================
+# AES-XTS (IEEE 1619) – MÃ HÓA THEO SECTOR
+# Demo học thuật – KHÔNG dùng cho bảo mật thực tế
+# =====================================================
+
+from .aes import AESTTable, AESNumpy, np
+
+
+BLOCK_SIZE = 16
+_MASK128 = (1 << 128) - 1
+
+
+def _make_cipher(key):
+    return AESNumpy(key) if np is not None else AESTTable(key)
+
+
+def _xor_bytes(a, b):
+    n = len(a)
+    return (int.from_bytes(a, "big") ^ int.from_bytes(b, "big")).to_bytes(n, "big")
+
+
+class AESXTS:
+    """
+    AES-128-XTS
+    ----------------------------------------
+    Khóa 32 byte = K1 (mã hóa dữ liệu) || K2 (mã hóa tweak)
+
+        T   = E(K2, số thứ tự sector)        (little-endian 128-bit)
+        T_j = T * α^j                        (GF(2^128))
+        C_j = E(K1, P_j XOR T_j) XOR T_j
+
+    - Mỗi sector mã hóa / giải mã độc lập, chỉ cần biết chỉ số sector
+    - Sector có phần đuôi < 16 byte dùng ciphertext stealing
+    - encrypt()/decrypt() cả buffer: nếu sector cuối chỉ còn 1–15 byte
+      (không đủ một khối để stealing), nó được gộp vào sector trước thành
+      một đơn vị dữ liệu dài hơn sector_size. Buffer < 16 byte → ValueError.
+    """
+
+    def __init__(self, key: bytes, sector_size: int = 4096):
+        if len(key) != 32:
+            raise ValueError("AES-XTS key must be 32 bytes (K1 || K2)")
+        if sector_size < BLOCK_SIZE:
+            raise ValueError(f"Sector phải có ít nhất {BLOCK_SIZE} bytes")
+        self.sector_size = sector_size
+        self.cipher = _make_cipher(key[:16])
+        self.tweak_cipher = AESTTable(key[16:])
+
+    # -----------------------------
+    # TWEAK
+    # -----------------------------
+
+    def _tweaks(self, index, count):
+        """Danh sách count giá trị tweak (int) cho sector index"""
+        t = int.from_bytes(
+            self.tweak_cipher.encrypt_block(index.to_bytes(16, "little")), "little"
+        )
+        out = []
+        for _ in range(count):
+            out.append(t)
+            t = ((t << 1) & _MASK128) ^ (0x87 if t >> 127 else 0)
+        return out
+
+    @staticmethod
+    def _tweak_bytes(tweaks):
+        return b"".join(t.to_bytes(16, "little") for t in tweaks)
+
+    def _xex(self, fn, data, tweaks):
+        """C = fn(P XOR T) XOR T cho nhiều khối liên tiếp"""
+        stream = self._tweak_bytes(tweaks)
+        return _xor_bytes(fn(_xor_bytes(data, stream)), stream)
+
+    def _check(self, data):
+        if not BLOCK_SIZE <= len(data) <= self.sector_size:
+            raise ValueError(
+                f"Dữ liệu sector phải từ {BLOCK_SIZE} đến {self.sector_size} bytes"
+            )
+
+    def _units(self, length):
+        """
+        (chỉ số sector, start, end) cho buffer length byte – phần đuôi
+        1–15 byte được gộp vào sector cuối cùng đầy đủ
+        """
+        if 0 < length < BLOCK_SIZE:
+            raise ValueError(f"AES-XTS cần ít nhất {BLOCK_SIZE} bytes dữ liệu (nhận {length})")
+        n = self.sector_size
+        bounds = list(range(0, length, n)) + [length]
+        if len(bounds) > 2 and bounds[-1] - bounds[-2] < BLOCK_SIZE:
+            del bounds[-2]
+        return [(i, bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)]
+
+    # -----------------------------
+    # MÃ HÓA / GIẢI MÃ 1 SECTOR
+    # -----------------------------
+
+    def encrypt_sector(self, index: int, data: bytes) -> bytes:
+        self._check(data)
+        return self._encrypt_unit(index, data)
+
+    def decrypt_sector(self, index: int, data: bytes) -> bytes:
+        self._check(data)
+        return self._decrypt_unit(index, data)
+
+    def _encrypt_unit(self, index, data):
+        enc = self.cipher.encrypt_blocks
+        m, tail = divmod(len(data), BLOCK_SIZE)
+        tweaks = self._tweaks(index, m + (1 if tail else 0))
+        if not tail:
+            return self._xex(enc, data, tweaks)
+
+        # Ciphertext stealing
+        full = (m - 1) * BLOCK_SIZE
+        head = self._xex(enc, data[:full], tweaks[:m - 1])
+        cc = self._xex(enc, data[full:full + BLOCK_SIZE], tweaks[m - 1:m])
+        pp = data[full + BLOCK_SIZE:] + cc[tail:]
+        return head + self._xex(enc, pp, tweaks[m:]) + cc[:tail]
+
+    def _decrypt_unit(self, index, data):
+        dec = self.cipher.decrypt_blocks
+        m, tail = divmod(len(data), BLOCK_SIZE)
+        tweaks = self._tweaks(index, m + (1 if tail else 0))
+        if not tail:
+            return self._xex(dec, data, tweaks)
+
+        full = (m - 1) * BLOCK_SIZE
+        head = self._xex(dec, data[:full], tweaks[:m - 1])
+        pp = self._xex(dec, data[full:full + BLOCK_SIZE], tweaks[m:])
+        cc = data[full + BLOCK_SIZE:] + pp[tail:]
+        return head + self._xex(dec, cc, tweaks[m - 1:m]) + pp[:tail]
+
+    # -----------------------------
+    # TOÀN BỘ BUFFER (sector 0, 1, 2, ...)
+    # -----------------------------
+
+    def encrypt(self, data: bytes, first_sector: int = 0) -> bytes:
+        """
+        Mã hóa buffer gồm nhiều sector liên tiếp (không đổi kích thước)
+        """
+        return b"".join(
+            self._encrypt_unit(first_sector + i, data[start:end])
+            for i, start, end in self._units(len(data))
+        )
+
+    def decrypt(self, data: bytes, first_sector: int = 0) -> bytes:
+        return b"".join(
+            self._decrypt_unit(first_sector + i, data[start:end])
+            for i, start, end in self._units(len(data))
+        )
+
+
+# =================================================
+# MODULE-LEVEL API
+# =================================================
+
+def encrypt(data: bytes, key: str) -> bytes:
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+    return AESXTS(key).encrypt(data)
+
+
+def decrypt(data: bytes, key: str) -> bytes:
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+    return AESXTS(key).decrypt(data)
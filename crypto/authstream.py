@@ -0,0 +1,336 @@
+# =====================================================
+# LUỒNG MÃ HÓA CÓ XÁC THỰC THEO TỪNG CHUNK
+# =====================================================
+# Mỗi chunk mang tag riêng, gắn với số thứ tự chunk và cờ "chunk cuối":
+# bên giải mã kiểm tra tag TRƯỚC khi giải mã và dừng ngay ở chunk hỏng
+# đầu tiên – không tốn CPU cho dữ liệu rác, plaintext trả ra từng chunk
+# đều đã được xác thực. Cắt cụt (thiếu chunk cuối), đổi thứ tự, chèn,
+# xóa chunk hay sửa header đều bị phát hiện.
+#
+#   HEADER  MAGIC "CAUT" | version | scheme | len+thuật toán
+#           | chunk_size (u32) | nonce (16)
+#   RECORD  độ dài (u32) | cờ (1) | ciphertext | tag
+#
+# chunk_size tối đa MAX_CHUNK_SIZE ở cả hai chiều: bên giải mã phải đệm
+# cả chunk trước khi kiểm tra tag, nên header giả mạo với chunk_size lớn
+# bị từ chối ngay thay vì bắt giữ hàng GB bộ nhớ.
+#
+# scheme 1 = CTR + HMAC-SHA256 (AES, DES, 3DES) – encrypt-then-MAC
+#   tag = HMAC(K_mac, SHA256(header) || seq || cờ || độ dài || ciphertext)
+# scheme 2 = AES-GCM, AAD = SHA256(header) || seq || cờ || độ dài
+#
+# Khóa mã hóa / khóa MAC được suy ra từ khóa người dùng và nonce
+# (HMAC-SHA256) → mỗi luồng dùng khóa con riêng.
+
+import hashlib
+import hmac
+import os
+import struct
+
+from . import modes
+
+
+MAGIC = b"CAUT"
+VERSION = 1
+NONCE_SIZE = 16
+DEFAULT_CHUNK_SIZE = 1 << 16
+MAX_CHUNK_SIZE = 1 << 24
+
+SCHEME_HMAC = 1
+SCHEME_GCM = 2
+_SCHEMES = {"hmac": SCHEME_HMAC, "gcm": SCHEME_GCM}
+
+FLAG_FINAL = 0x01
+
+_RECORD = struct.Struct(">IB")
+_SEQ = struct.Struct(">Q")
+_U32 = struct.Struct(">I")
+
+
+def _subkey(key, label, nonce, length):
+    return hmac.new(key, label + nonce, hashlib.sha256).digest()[:length]
+
+
+class _Session:
+    """
+    Trạng thái dùng chung cho hai chiều: thuật toán, khóa con, header digest
+    """
+
+    def __init__(self, algorithm, key, scheme, chunk_size, nonce):
+        from . import registry
+
+        alg = registry.get(algorithm)
+        engine = alg.engine()
+        if "ecb" not in engine.modes:
+            raise ValueError(f"{alg.name.upper()} không dùng được cho luồng xác thực")
+        key = registry._key_bytes(alg, engine, key)
+        if scheme == SCHEME_GCM and alg.name != "aes":
+            raise ValueError("Scheme GCM chỉ dùng với AES")
+        if scheme not in (SCHEME_HMAC, SCHEME_GCM):
+            raise ValueError(f"Scheme xác thực không hỗ trợ: {scheme}")
+
+        self.algorithm = alg.name
+        self.scheme = scheme
+        self.chunk_size = chunk_size
+        self.nonce = nonce
+        enc_key = _subkey(key, b"authstream-enc", nonce, len(key))
+        if scheme == SCHEME_GCM:
+            from .aes_gcm import AESGCM, TAG_SIZE
+            self._gcm = AESGCM(enc_key)
+            self.tag_size = TAG_SIZE
+        else:
+            self.cipher = engine.factory(enc_key)
+            self._mac_key = _subkey(key, b"authstream-mac", nonce, 32)
+            self.tag_size = hashlib.sha256().digest_size
+            bs = self.cipher.block_size
+            self._per_chunk = -(-chunk_size // bs)
+            self._iv_base = int.from_bytes(nonce[:bs], "big")
+            self._iv_mask = (1 << (8 * bs)) - 1
+
+        alg_name = self.algorithm.encode("ascii")
+        self.header = (
+            MAGIC + bytes([VERSION, scheme, len(alg_name)]) + alg_name
+            + _U32.pack(chunk_size) + nonce
+        )
+        self._header_digest = hashlib.sha256(self.header).digest()
+
+    def _bind(self, seq, flags, length):
+        return self._header_digest + _SEQ.pack(seq) + _RECORD.pack(length, flags)
+
+    def _ctr(self, seq):
+        bs = self.cipher.block_size
+        iv = ((self._iv_base + seq * self._per_chunk) & self._iv_mask).to_bytes(bs, "big")
+        return modes.CTR(self.cipher, iv=iv)
+
+    def _gcm_iv(self, seq):
+        return self.nonce[:4] + _SEQ.pack(seq)
+
+    def seal(self, seq, flags, data):
+        bound = self._bind(seq, flags, len(data))
+        if self.scheme == SCHEME_GCM:
+            ct, tag = self._gcm.seal(self._gcm_iv(seq), data, bound)
+        else:
+            ct = modes.xor_bytes(data, self._ctr(seq).keystream(0, len(data)))
+            tag = hmac.new(self._mac_key, bound + ct, hashlib.sha256).digest()
+        return _RECORD.pack(len(ct), flags) + ct + tag
+
+    def open(self, seq, flags, ct, tag):
+        bound = self._bind(seq, flags, len(ct))
+        if self.scheme == SCHEME_GCM:
+            try:
+                return self._gcm.open(self._gcm_iv(seq), ct, tag, bound)
+            except ValueError:
+                raise ValueError(f"Xác thực thất bại ở chunk {seq}")
+        expected = hmac.new(self._mac_key, bound + ct, hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, tag):
+            raise ValueError(f"Xác thực thất bại ở chunk {seq}")
+        return modes.xor_bytes(ct, self._ctr(seq).keystream(0, len(ct)))
+
+
+# -----------------------------
+# MÃ HÓA
+# -----------------------------
+
+class AuthEncryptor:
+    """
+    Mã hóa có xác thực dạng luồng (update / finalize)
+    ----------------------------------------
+    update() trả về header (lần đầu) và các record đầy đủ;
+    chunk cuối (có thể rỗng) luôn được giữ lại tới finalize() để gắn cờ FINAL.
+    """
+
+    def __init__(self, algorithm: str, key, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 scheme: str = "hmac", nonce: bytes = None):
+        if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+            raise ValueError(f"chunk_size phải từ 1 đến {MAX_CHUNK_SIZE} bytes")
+        try:
+            scheme_id = _SCHEMES[scheme]
+        except KeyError:
+            raise ValueError(f"Scheme xác thực không hỗ trợ: {scheme}")
+        nonce = nonce or os.urandom(NONCE_SIZE)
+        if len(nonce) != NONCE_SIZE:
+            raise ValueError(f"Nonce phải đúng {NONCE_SIZE} bytes")
+        self._s = _Session(algorithm, key, scheme_id, chunk_size, nonce)
+        self._buf = bytearray()
+        self._seq = 0
+        self._header_sent = False
+        self._done = False
+
+    def _header(self):
+        if self._header_sent:
+            return b""
+        self._header_sent = True
+        return self._s.header
+
+    def update(self, data: bytes) -> bytes:
+        if self._done:
+            raise ValueError("AuthEncryptor đã finalize")
+        buf = self._buf
+        buf += data
+        cs = self._s.chunk_size
+        out = [self._header()]
+        # Giữ lại ít nhất 1 byte: chưa biết chunk nào là chunk cuối
+        while len(buf) > cs:
+            out.append(self._s.seal(self._seq, 0, bytes(buf[:cs])))
+            del buf[:cs]
+            self._seq += 1
+        return b"".join(out)
+
+    def finalize(self) -> bytes:
+        if self._done:
+            raise ValueError("AuthEncryptor đã finalize")
+        self._done = True
+        out = self._header() + self._s.seal(self._seq, FLAG_FINAL, bytes(self._buf))
+        self._buf.clear()
+        return out
+
+
+# -----------------------------
+# GIẢI MÃ
+# -----------------------------
+
+class AuthDecryptor:
+    """
+    Giải mã dạng luồng, dừng ở chunk hỏng đầu tiên
+    ----------------------------------------
+    - update(data): trả về plaintext của các chunk ĐÃ xác thực
+    - finalize(): báo lỗi nếu luồng bị cắt cụt (chưa thấy chunk cuối)
+    Sau lỗi đầu tiên, mọi lần gọi tiếp theo đều báo lỗi.
+    algorithm: nếu chỉ định, header phải khớp (chống đổi thuật toán)
+    """
+
+    def __init__(self, key, algorithm: str = None):
+        self._key = key
+        self._expect = algorithm
+        self._s = None
+        self._buf = bytearray()
+        self._seq = 0
+        self._final = False
+        self._failed = None
+        self._done = False
+
+    def _fail(self, message):
+        self._failed = message
+        self._buf.clear()
+        raise ValueError(message)
+
+    def _parse_header(self):
+        buf = self._buf
+        fixed = len(MAGIC) + 3
+        if len(buf) < fixed:
+            return False
+        if buf[:len(MAGIC)] != MAGIC:
+            self._fail("Không phải luồng CAUT")
+        version, scheme, name_len = buf[len(MAGIC):fixed]
+        if version != VERSION:
+            self._fail(f"Phiên bản không hỗ trợ: {version}")
+        total = fixed + name_len + 4 + NONCE_SIZE
+        if len(buf) < total:
+            return False
+        algorithm = bytes(buf[fixed:fixed + name_len]).decode("ascii", "replace")
+        chunk_size = _U32.unpack_from(buf, fixed + name_len)[0]
+        nonce = bytes(buf[total - NONCE_SIZE:total])
+        if self._expect is not None:
+            from . import registry
+            if registry.get(self._expect).name != algorithm:
+                self._fail("Thuật toán trong header không khớp")
+        if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+            self._fail("Header không hợp lệ: chunk_size vượt giới hạn")
+        try:
+            self._s = _Session(algorithm, self._key, scheme, chunk_size, nonce)
+        except ValueError as e:
+            self._fail(str(e))
+        del buf[:total]
+        return True
+
+    def update(self, data: bytes) -> bytes:
+        if self._failed:
+            raise ValueError(self._failed)
+        if self._done:
+            raise ValueError("AuthDecryptor đã finalize")
+        buf = self._buf
+        buf += data
+        if self._s is None and not self._parse_header():
+            return b""
+        s = self._s
+        out = []
+        while buf:
+            if self._final:
+                self._fail("Có dữ liệu thừa sau chunk cuối")
+            if len(buf) < _RECORD.size:
+                break
+            length, flags = _RECORD.unpack_from(buf)
+            # Độ dài sai → dừng ngay, không chờ đọc hết record rác
+            if flags & ~FLAG_FINAL or length > s.chunk_size or (
+                    not flags & FLAG_FINAL and length != s.chunk_size):
+                self._fail(f"Record không hợp lệ ở chunk {self._seq}")
+            end = _RECORD.size + length + s.tag_size
+            if len(buf) < end:
+                break
+            ct = bytes(buf[_RECORD.size:_RECORD.size + length])
+            tag = bytes(buf[_RECORD.size + length:end])
+            try:
+                out.append(s.open(self._seq, flags, ct, tag))
+            except ValueError as e:
+                self._fail(str(e))
+            del buf[:end]
+            self._seq += 1
+            self._final = bool(flags & FLAG_FINAL)
+        return b"".join(out)
+
+    def finalize(self) -> bytes:
+        if self._failed:
+            raise ValueError(self._failed)
+        if self._done:
+            raise ValueError("AuthDecryptor đã finalize")
+        self._done = True
+        if not self._final:
+            self._fail("Luồng bị cắt cụt: thiếu chunk cuối")
+        return b""
+
+
+# -----------------------------
+# MODULE-LEVEL API
+# -----------------------------
+
+def encrypt(data: bytes, key, algorithm: str = "aes", chunk_size: int = DEFAULT_CHUNK_SIZE,
+            scheme: str = "hmac") -> bytes:
+    enc = AuthEncryptor(algorithm, key, chunk_size, scheme)
+    return enc.update(data) + enc.finalize()
+
+
+def decrypt(data: bytes, key, algorithm: str = None) -> bytes:
+    dec = AuthDecryptor(key, algorithm)
+    return dec.update(data) + dec.finalize()
+
+
+def decrypt_stream(fileobj, key, algorithm: str = None, read_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Generator: đọc fileobj từng phần, trả ra plaintext đã xác thực ngay khi có
+    """
+    dec = AuthDecryptor(key, algorithm)
+    while True:
+        data = fileobj.read(read_size)
+        if not data:
+            break
+        out = dec.update(data)
+        if out:
+            yield out
+    dec.finalize()
+
+
+class AESAuthStream:
+    """
+    Bọc cho registry / app.py: AES + HMAC theo chunk, giao diện encrypt/decrypt
+    """
+
+    def __init__(self, key: bytes):
+        if len(key) != 16:
+            raise ValueError("AES-128 key must be 16 bytes")
+        self.key = key
+
+    def encrypt(self, data: bytes) -> bytes:
+        return encrypt(data, self.key, "aes")
+
+    def decrypt(self, data: bytes) -> bytes:
+        return decrypt(data, self.key, "aes")
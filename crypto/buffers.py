@@ -0,0 +1,70 @@
+# =====================================================
+# GHI TRỰC TIẾP VÀO BUFFER CÓ SẴN (encrypt_into / decrypt_into)
+# Dùng chung cho AES, DES, TripleDES
+# =====================================================
+
+
+def _byte_view(buf):
+    """memoryview 1 chiều dạng byte của bất kỳ buffer nào (bytes, bytearray, mmap...)"""
+    mv = memoryview(buf)
+    return mv if mv.format == "B" and mv.ndim == 1 else mv.cast("B")
+
+
+class BufferMixin:
+    """
+    Bổ sung cho lớp cipher có block_size, encrypt_block, decrypt_block:
+
+    - encrypt_into(src, dst): padding PKCS#5/#7 + ECB, ghi vào dst
+    - decrypt_into(src, dst): ECB + kiểm tra padding, ghi vào dst
+
+    Khối được đọc qua memoryview (không cắt copy) và ghi thẳng vào
+    bytearray / mmap do người gọi cấp phát trước.
+    """
+
+    def encrypt_blocks_into(self, src, dst):
+        """ECB thô: mã hóa src (bội số block_size) vào dst cùng độ dài"""
+        bs, enc = self.block_size, self.encrypt_block
+        for i in range(0, len(src), bs):
+            dst[i:i + bs] = enc(src[i:i + bs])
+
+    def decrypt_blocks_into(self, src, dst):
+        bs, dec = self.block_size, self.decrypt_block
+        for i in range(0, len(src), bs):
+            dst[i:i + bs] = dec(src[i:i + bs])
+
+    def encrypt_into(self, src, dst) -> int:
+        """
+        Mã hóa src vào dst, trả về số byte đã ghi (= độ dài sau padding)
+        """
+        bs = self.block_size
+        src, dst = _byte_view(src), _byte_view(dst)
+        n = len(src)
+        full = n - n % bs
+        pad_len = bs - n % bs
+        total = n + pad_len
+        if len(dst) < total:
+            raise ValueError(f"Buffer đích cần ít nhất {total} bytes")
+
+        self.encrypt_blocks_into(src[:full], dst[:full])
+        dst[full:total] = self.encrypt_block(bytes(src[full:]) + bytes([pad_len] * pad_len))
+        return total
+
+    def decrypt_into(self, src, dst) -> int:
+        """
+        Giải mã src vào dst, trả về độ dài plaintext (đã bỏ padding)
+        """
+        bs = self.block_size
+        src, dst = _byte_view(src), _byte_view(dst)
+        n = len(src)
+        if n == 0 or n % bs != 0:
+            raise ValueError(f"Dữ liệu không phải bội số {bs} bytes")
+        if len(dst) < n:
+            raise ValueError(f"Buffer đích cần ít nhất {n} bytes")
+
+        self.decrypt_blocks_into(src, dst[:n])
+        pad_len = dst[n - 1]
+        if pad_len < 1 or pad_len > bs:
+            raise ValueError(f"Invalid padding length: {pad_len}")
+        if dst[n - pad_len:n] != bytes([pad_len] * pad_len):
+            raise ValueError("Invalid padding bytes")
+        return n - pad_len
@@ -0,0 +1,268 @@
+# =====================================================
+# NÉN TRƯỚC KHI MÃ HÓA (COMPRESS-THEN-ENCRYPT)
+# =====================================================
+# Dữ liệu văn bản / log nén được 3–5 lần → số byte đi qua vòng lặp khối
+# thuần Python giảm tương ứng. Dữ liệu đã nén sẵn (JPEG, PNG, ZIP, ...)
+# được phát hiện bằng chữ ký đầu file + lấy mẫu và giữ nguyên.
+#
+# Định dạng: MAGIC (3 bytes) || codec (1 byte) || dữ liệu
+#   codec 0 = không nén, 1 = zlib, 2 = lzma (xz)
+#
+# Mức nén: 0 = tắt, 1..9 = zlib, 10..19 = lzma preset 0..9
+#
+# Giải nén có giới hạn kích thước đầu ra (MAX_OUTPUT) – vài KB dữ liệu nén
+# có thể bung ra hàng GB (zip bomb), vượt giới hạn → ValueError.
+#
+# Lưu ý: nén trước khi mã hóa làm lộ thông tin qua độ dài bản mã
+# (kiểu CRIME/BREACH) nếu kẻ tấn công chèn được dữ liệu vào plaintext.
+
+import lzma
+import zlib
+
+
+MAGIC = b"\x89CZ"
+HEADER_SIZE = len(MAGIC) + 1
+
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_LZMA = 2
+
+SAMPLE_SIZE = 4096      # kích thước mỗi mẫu
+SAMPLE_COUNT = 4        # số mẫu trải đều trên dữ liệu
+MIN_RATIO = 0.9         # mẫu nén còn > 90% → coi như không nén được
+MIN_SIZE = 64           # dữ liệu quá nhỏ: header + overhead lớn hơn lợi ích
+MAX_OUTPUT = 256 << 20  # giới hạn mặc định của dữ liệu sau giải nén
+
+# Chữ ký các định dạng đã nén sẵn: (offset, bytes)
+_SIGNATURES = [
+    (0, b"\xff\xd8\xff"),           # JPEG
+    (0, b"\x89PNG\r\n\x1a\n"),      # PNG
+    (0, b"GIF8"),                   # GIF
+    (0, b"\x1f\x8b"),               # gzip
+    (0, b"PK\x03\x04"),             # zip, docx, xlsx, jar, apk
+    (0, b"BZh"),                    # bzip2
+    (0, b"\xfd7zXZ\x00"),           # xz
+    (0, b"7z\xbc\xaf\x27\x1c"),     # 7z
+    (0, b"\x28\xb5\x2f\xfd"),       # zstd
+    (0, b"Rar!"),                   # rar
+    (0, b"OggS"),                   # ogg
+    (0, b"ID3"),                    # mp3
+    (0, b"fLaC"),                   # flac
+    (4, b"ftyp"),                   # mp4, mov, heic
+    (0, MAGIC),                     # đã qua bước nén này
+]
+
+
+def _has_signature(data) -> bool:
+    for offset, sig in _SIGNATURES:
+        if data[offset:offset + len(sig)] == sig:
+            return True
+    # WEBP / AVI / WAV: RIFF....WEBP – chỉ WEBP là đã nén
+    return data[:4] == b"RIFF" and data[8:12] == b"WEBP"
+
+
+def is_compressible(data) -> bool:
+    """
+    Đoán nhanh dữ liệu có đáng nén hay không:
+    chữ ký định dạng đã nén, rồi nén thử vài mẫu bằng zlib mức 1
+    """
+    n = len(data)
+    if n < MIN_SIZE or _has_signature(data):
+        return False
+    if n <= SAMPLE_SIZE * SAMPLE_COUNT:
+        samples = [data]
+    else:
+        step = (n - SAMPLE_SIZE) // (SAMPLE_COUNT - 1)
+        samples = [data[i * step:i * step + SAMPLE_SIZE] for i in range(SAMPLE_COUNT)]
+    raw = sum(len(s) for s in samples)
+    packed = sum(len(zlib.compress(bytes(s), 1)) for s in samples)
+    return packed < raw * MIN_RATIO
+
+
+def _codec_for(level: int) -> int:
+    if level <= 0:
+        return CODEC_NONE
+    return CODEC_ZLIB if level <= 9 else CODEC_LZMA
+
+
+def _compressobj(codec, level):
+    if codec == CODEC_ZLIB:
+        return zlib.compressobj(min(level, 9))
+    if codec == CODEC_LZMA:
+        return lzma.LZMACompressor(preset=min(level - 10, 9))
+    return None
+
+
+def _decompressobj(codec):
+    if codec == CODEC_ZLIB:
+        return zlib.decompressobj()
+    if codec == CODEC_LZMA:
+        return lzma.LZMADecompressor()
+    if codec == CODEC_NONE:
+        return None
+    raise ValueError(f"Codec nén không hỗ trợ: {codec}")
+
+
+# -----------------------------
+# DẠNG LUỒNG
+# -----------------------------
+
+class Compressor:
+    """
+    Nén tăng dần (update / finalize), header ghi ở đầu kết quả
+    ----------------------------------------
+    Codec được chọn khi đã gom đủ SAMPLE_SIZE * SAMPLE_COUNT byte đầu
+    (hoặc khi finalize): dữ liệu không nén được → codec 0 (giữ nguyên).
+    """
+
+    def __init__(self, level: int = 6, detect: bool = True):
+        self.level = level
+        self.detect = detect
+        self.codec = None
+        self._obj = None
+        self._pending = bytearray()
+        self._done = False
+
+    def _start(self):
+        codec = _codec_for(self.level)
+        if codec != CODEC_NONE and self.detect and not is_compressible(self._pending):
+            codec = CODEC_NONE
+        self.codec = codec
+        self._obj = _compressobj(codec, self.level)
+        data = bytes(self._pending)
+        self._pending.clear()
+        return MAGIC + bytes([codec]) + self._feed(data)
+
+    def _feed(self, data):
+        return self._obj.compress(data) if self._obj is not None else data
+
+    def update(self, data: bytes) -> bytes:
+        if self._done:
+            raise ValueError("Compressor đã finalize")
+        if self.codec is None:
+            self._pending += data
+            if len(self._pending) < SAMPLE_SIZE * SAMPLE_COUNT:
+                return b""
+            return self._start()
+        return self._feed(bytes(data))
+
+    def finalize(self) -> bytes:
+        if self._done:
+            raise ValueError("Compressor đã finalize")
+        out = self._start() if self.codec is None else b""
+        self._done = True
+        if self._obj is not None:
+            out += self._obj.flush()
+        return out
+
+
+class Decompressor:
+    """
+    Giải nén tăng dần – đọc header ở những byte đầu tiên
+    max_size: tổng số byte đầu ra tối đa (None = không giới hạn)
+    """
+
+    def __init__(self, max_size: int = MAX_OUTPUT):
+        self.codec = None
+        self.max_size = max_size
+        self._obj = None
+        self._head = bytearray()
+        self._out = 0
+        self._done = False
+
+    def _count(self, out):
+        self._out += len(out)
+        if self.max_size is not None and self._out > self.max_size:
+            raise ValueError(f"Dữ liệu giải nén vượt quá giới hạn {self.max_size} bytes")
+        return out
+
+    def update(self, data: bytes) -> bytes:
+        if self._done:
+            raise ValueError("Decompressor đã finalize")
+        if self.codec is None:
+            self._head += data
+            if len(self._head) < HEADER_SIZE:
+                return b""
+            if self._head[:len(MAGIC)] != MAGIC:
+                raise ValueError("Dữ liệu không có header nén")
+            self.codec = self._head[len(MAGIC)]
+            self._obj = _decompressobj(self.codec)
+            data = bytes(self._head[HEADER_SIZE:])
+            self._head.clear()
+        if self._obj is None:
+            return self._count(bytes(data))
+        # Chỉ xin tối đa (phần còn lại + 1) byte: nhận đủ số đó nghĩa là đã
+        # vượt giới hạn, không bao giờ bung hết dữ liệu vào bộ nhớ
+        try:
+            if self.max_size is None:
+                return self._obj.decompress(data)
+            return self._count(self._obj.decompress(data, self.max_size - self._out + 1))
+        except (zlib.error, lzma.LZMAError) as e:
+            raise ValueError(f"Dữ liệu nén bị hỏng: {e}")
+
+    def finalize(self) -> bytes:
+        if self._done:
+            raise ValueError("Decompressor đã finalize")
+        self._done = True
+        if self.codec is None:
+            raise ValueError("Dữ liệu không có header nén")
+        if self.codec == CODEC_ZLIB:
+            if not self._obj.eof:
+                raise ValueError("Dữ liệu nén bị cắt cụt")
+            return self._count(self._obj.flush())
+        if self.codec == CODEC_LZMA and not self._obj.eof:
+            raise ValueError("Dữ liệu nén bị cắt cụt")
+        return b""
+
+
+# -----------------------------
+# GHÉP VỚI CIPHER
+# -----------------------------
+
+class CompressingEncryptor:
+    """
+    Nén rồi mã hóa dạng luồng: Compressor → cipher.encryptor()
+    Kết quả giống cipher.encrypt(compress(toàn bộ dữ liệu))
+    """
+
+    def __init__(self, cipher, level: int = 6):
+        self._compressor = Compressor(level)
+        self._encryptor = cipher.encryptor()
+
+    def update(self, data: bytes) -> bytes:
+        return self._encryptor.update(self._compressor.update(data))
+
+    def finalize(self) -> bytes:
+        out = self._encryptor.update(self._compressor.finalize())
+        return out + self._encryptor.finalize()
+
+
+class DecryptingDecompressor:
+    """
+    Giải mã rồi giải nén dạng luồng: cipher.decryptor() → Decompressor
+    """
+
+    def __init__(self, cipher, max_size: int = MAX_OUTPUT):
+        self._decryptor = cipher.decryptor()
+        self._decompressor = Decompressor(max_size)
+
+    def update(self, data: bytes) -> bytes:
+        return self._decompressor.update(self._decryptor.update(data))
+
+    def finalize(self) -> bytes:
+        out = self._decompressor.update(self._decryptor.finalize())
+        return out + self._decompressor.finalize()
+
+
+# -----------------------------
+# MODULE-LEVEL API
+# -----------------------------
+
+def compress(data: bytes, level: int = 6, detect: bool = True) -> bytes:
+    c = Compressor(level, detect)
+    return c.update(data) + c.finalize()
+
+
+def decompress(data: bytes, max_size: int = MAX_OUTPUT) -> bytes:
+    d = Decompressor(max_size)
+    return d.update(data) + d.finalize()
@@ -0,0 +1,295 @@
+# =====================================================
+# ĐỊNH DẠNG CONTAINER CHIA CHUNK + BẢNG CHỈ MỤC
+# =====================================================
+# Mỗi chunk plaintext (chunk_size byte, chunk cuối có thể ngắn hơn) được
+# mã hóa độc lập → giải mã song song hoặc chỉ giải mã chunk chứa offset
+# cần đọc. Dùng được với mọi engine có ECB trong registry (AES, DES, 3DES).
+#
+#   HEADER
+#     MAGIC "CENC" | version (1) | len+tên thuật toán | len+chế độ
+#     | chunk_size (u32) | len+IV gốc
+#   CHUNK 0 .. CHUNK n-1          (ciphertext, không kèm IV)
+#   INDEX   n × (offset u64, độ dài u32)
+#   FOOTER  số chunk (u32) | tổng plaintext (u64) | offset INDEX (u64) | "CIDX"
+#
+# IV của từng chunk suy ra từ IV gốc và số thứ tự chunk:
+#   ctr            : IV gốc + i * số khối mỗi chunk (các dải counter không chồng nhau)
+#   cbc / cfb / ofb: E_K(IV gốc XOR i)
+#   ecb            : không dùng IV
+# ECB / CBC padding PKCS#7 theo từng chunk.
+
+import io
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+from . import modes
+from .keycache import cached_cipher
+
+
+MAGIC = b"CENC"
+FOOTER_MAGIC = b"CIDX"
+VERSION = 1
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_FOOTER = struct.Struct(">IQQ4s")
+_ENTRY = struct.Struct(">QI")
+_U32 = struct.Struct(">I")
+
+
+# -----------------------------
+# CIPHER / IV
+# -----------------------------
+
+def _factory(algorithm, key):
+    """Lớp cipher (engine đã chọn trong registry) + khóa dạng bytes"""
+    from . import registry
+
+    alg = registry.get(algorithm)
+    engine = alg.engine()
+    if "ecb" not in engine.modes:
+        raise ValueError(f"{alg.name.upper()} không dùng được trong container")
+    return alg.name, engine.factory, registry._key_bytes(alg, engine, key)
+
+
+def _chunk_iv(cipher, mode, base_iv, index, chunk_size):
+    bs = cipher.block_size
+    if mode == "ecb":
+        return None
+    if mode == "ctr":
+        per_chunk = -(-chunk_size // bs)
+        value = (int.from_bytes(base_iv, "big") + index * per_chunk) % (1 << (8 * bs))
+        return value.to_bytes(bs, "big")
+    block = modes.xor_bytes(base_iv, index.to_bytes(bs, "big"))
+    return cipher.encrypt_block(block)
+
+
+def _encrypt_chunk(cipher, mode, base_iv, index, chunk_size, data):
+    iv = _chunk_iv(cipher, mode, base_iv, index, chunk_size)
+    m = modes.new(cipher, mode, iv=iv)
+    return m.encrypt(data)[len(m.iv):]
+
+
+def _decrypt_chunk(cipher, mode, base_iv, index, chunk_size, data):
+    iv = _chunk_iv(cipher, mode, base_iv, index, chunk_size)
+    m = modes.new(cipher, mode, iv=iv)
+    return m.decrypt(m.iv + data)
+
+
+def _decrypt_job(args):
+    """Chạy trong process con: giải mã 1 chunk"""
+    cls, key, mode, base_iv, index, chunk_size, data = args
+    with cached_cipher(cls, key) as cipher:
+        return _decrypt_chunk(cipher, mode, base_iv, index, chunk_size, data)
+
+
+# -----------------------------
+# GHI
+# -----------------------------
+
+class ContainerWriter:
+    """
+    Ghi container dạng luồng vào file object
+    ----------------------------------------
+        with open("out.cenc", "wb") as f:
+            w = ContainerWriter(f, "aes", key, mode="ctr")
+            w.write(data1); w.write(data2)
+            w.close()                  # ghi INDEX + FOOTER
+    """
+
+    def __init__(self, fileobj, algorithm: str, key, mode: str = "ctr",
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, iv: bytes = None):
+        self.algorithm, cls, key = _factory(algorithm, key)
+        self.cipher = cls(key)
+        bs = self.cipher.block_size
+        mode = mode.lower()
+        if mode not in modes.MODES:
+            raise ValueError(f"Chế độ chưa được hỗ trợ: {mode}")
+        if chunk_size <= 0 or chunk_size % bs:
+            raise ValueError(f"chunk_size phải là bội số dương của {bs}")
+        if iv is None:
+            iv = b"" if mode == "ecb" else os.urandom(bs)
+        if mode != "ecb" and len(iv) != bs:
+            raise ValueError(f"IV phải đúng {bs} bytes")
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.iv = iv
+        self._f = fileobj
+        self._buf = bytearray()
+        self._index = []
+        self._size = 0
+        self._closed = False
+        self._offset = self._write_header()
+
+    def _write_header(self):
+        alg = self.algorithm.encode("ascii")
+        mode = self.mode.encode("ascii")
+        header = (
+            MAGIC + bytes([VERSION])
+            + bytes([len(alg)]) + alg
+            + bytes([len(mode)]) + mode
+            + _U32.pack(self.chunk_size)
+            + bytes([len(self.iv)]) + self.iv
+        )
+        self._f.write(header)
+        return len(header)
+
+    def _flush_chunk(self, data):
+        ct = _encrypt_chunk(self.cipher, self.mode, self.iv, len(self._index), self.chunk_size, data)
+        self._f.write(ct)
+        self._index.append((self._offset, len(ct)))
+        self._offset += len(ct)
+        self._size += len(data)
+
+    def write(self, data: bytes):
+        if self._closed:
+            raise ValueError("Container đã đóng")
+        buf = self._buf
+        buf += data
+        cs = self.chunk_size
+        n = len(buf) - len(buf) % cs
+        for i in range(0, n, cs):
+            self._flush_chunk(bytes(buf[i:i + cs]))
+        del buf[:n]
+
+    def close(self):
+        if self._closed:
+            return
+        if self._buf:
+            self._flush_chunk(bytes(self._buf))
+            self._buf.clear()
+        self._closed = True
+        index_offset = self._offset
+        self._f.write(b"".join(_ENTRY.pack(off, length) for off, length in self._index))
+        self._f.write(_FOOTER.pack(len(self._index), self._size, index_offset, FOOTER_MAGIC))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# -----------------------------
+# ĐỌC
+# -----------------------------
+
+class ContainerReader:
+    """
+    Đọc container từ file object có seek (hoặc bytes)
+    ----------------------------------------
+    - read_chunk(i): giải mã riêng chunk i
+    - read(offset, length): chỉ giải mã các chunk phủ vùng yêu cầu
+    - read_all(workers): giải mã toàn bộ, song song nếu workers > 1
+    """
+
+    def __init__(self, source, key):
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        self._f = source
+        self._read_header()
+        self.algorithm, self._cls, self._key = _factory(self.algorithm, key)
+        self.cipher = self._cls(self._key)
+        self._read_index()
+
+    def _read_exact(self, n):
+        data = self._f.read(n)
+        if len(data) != n:
+            raise ValueError("Container bị cắt cụt")
+        return data
+
+    def _read_str(self):
+        return self._read_exact(self._read_exact(1)[0])
+
+    def _read_header(self):
+        f = self._f
+        f.seek(0)
+        if self._read_exact(len(MAGIC)) != MAGIC:
+            raise ValueError("Không phải container CENC")
+        self.version = self._read_exact(1)[0]
+        if self.version != VERSION:
+            raise ValueError(f"Phiên bản container không hỗ trợ: {self.version}")
+        self.algorithm = self._read_str().decode("ascii")
+        self.mode = self._read_str().decode("ascii")
+        if self.mode not in modes.MODES:
+            raise ValueError(f"Chế độ chưa được hỗ trợ: {self.mode}")
+        self.chunk_size = _U32.unpack(self._read_exact(4))[0]
+        self.iv = self._read_str()
+        self._data_start = f.tell()
+
+    def _read_index(self):
+        f = self._f
+        end = f.seek(0, io.SEEK_END)
+        if end - self._data_start < _FOOTER.size:
+            raise ValueError("Container bị cắt cụt")
+        f.seek(end - _FOOTER.size)
+        count, self.size, index_offset, magic = _FOOTER.unpack(self._read_exact(_FOOTER.size))
+        if magic != FOOTER_MAGIC or index_offset + count * _ENTRY.size != end - _FOOTER.size:
+            raise ValueError("Bảng chỉ mục container không hợp lệ")
+        f.seek(index_offset)
+        raw = self._read_exact(count * _ENTRY.size)
+        self.index = [_ENTRY.unpack_from(raw, i * _ENTRY.size) for i in range(count)]
+        expected = -(-self.size // self.chunk_size) if self.size else 0
+        if count != expected:
+            raise ValueError("Bảng chỉ mục container không hợp lệ")
+        for off, length in self.index:
+            if off < self._data_start or off + length > index_offset:
+                raise ValueError("Bảng chỉ mục container không hợp lệ")
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self.index)
+
+    def _chunk_ct(self, i):
+        off, length = self.index[i]
+        self._f.seek(off)
+        return self._read_exact(length)
+
+    def read_chunk(self, i: int) -> bytes:
+        if not 0 <= i < len(self.index):
+            raise IndexError("Chunk ngoài phạm vi")
+        return _decrypt_chunk(self.cipher, self.mode, self.iv, i, self.chunk_size, self._chunk_ct(i))
+
+    def read(self, offset: int, length: int) -> bytes:
+        """Plaintext [offset, offset + length) – chỉ giải mã các chunk liên quan"""
+        if offset < 0 or length < 0:
+            raise ValueError("offset / length không hợp lệ")
+        end = min(offset + length, self.size)
+        if offset >= end:
+            return b""
+        cs = self.chunk_size
+        first, last = offset // cs, (end - 1) // cs
+        data = b"".join(self.read_chunk(i) for i in range(first, last + 1))
+        start = offset - first * cs
+        return data[start:start + end - offset]
+
+    def read_all(self, workers: int = 1) -> bytes:
+        n = len(self.index)
+        if workers <= 1 or n < 2:
+            return b"".join(self.read_chunk(i) for i in range(n))
+        jobs = [
+            (self._cls, self._key, self.mode, self.iv, i, self.chunk_size, self._chunk_ct(i))
+            for i in range(n)
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return b"".join(pool.map(_decrypt_job, jobs, chunksize=max(1, n // (workers * 4))))
+
+
+# -----------------------------
+# MODULE-LEVEL API
+# -----------------------------
+
+def encrypt(data: bytes, key, algorithm: str = "aes", mode: str = "ctr",
+            chunk_size: int = DEFAULT_CHUNK_SIZE) -> bytes:
+    out = io.BytesIO()
+    with ContainerWriter(out, algorithm, key, mode=mode, chunk_size=chunk_size) as w:
+        w.write(data)
+    return out.getvalue()
+
+
+def decrypt(data: bytes, key, workers: int = 1) -> bytes:
+    return ContainerReader(data, key).read_all(workers)
+
+
+def decrypt_range(data: bytes, key, offset: int, length: int) -> bytes:
+    return ContainerReader(data, key).read(offset, length)
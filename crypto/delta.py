@@ -0,0 +1,200 @@
+# =====================================================
+# MÃ HÓA LẠI THEO DELTA (CHỈ CÁC CHUNK THAY ĐỔI)
+# =====================================================
+# Với chế độ mà mỗi khối độc lập (ECB của AES / DES / TripleDES, CTR trong
+# crypto.modes), ciphertext tại offset x chỉ phụ thuộc plaintext tại x:
+# so digest từng chunk của bản cũ và bản mới, chỉ mã hóa lại các chunk
+# khác nhau và ghi đè đúng vị trí trong ciphertext cũ.
+#
+# Chunk cố định theo offset (không dùng rolling hash): chèn / xóa byte làm
+# dịch mọi khối phía sau, mà vị trí khối trong ECB / CTR gắn với offset,
+# nên phần sau điểm chèn đằng nào cũng phải mã hóa lại.
+#
+# CẢNH BÁO: mã hóa lại cùng vị trí CTR với cùng IV là dùng lại keystream –
+# ai có cả hai bản ciphertext sẽ biết XOR hai bản plaintext tại vùng sửa.
+# ECB vốn đã lộ khối trùng nhau. Demo học thuật – KHÔNG dùng cho bảo mật
+# thực tế.
+
+import hashlib
+import json
+import os
+
+from . import modes
+
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+_DIGEST_SIZE = 16
+_SUPPORTED = ("ecb", "ctr")
+
+
+def _digest(data) -> bytes:
+    return hashlib.blake2b(data, digest_size=_DIGEST_SIZE).digest()
+
+
+class Manifest:
+    """
+    Digest của từng chunk plaintext + thông tin để đối chiếu lần sau
+    """
+
+    def __init__(self, mode: str, chunk_size: int, size: int, digests):
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.size = size
+        self.digests = list(digests)
+
+    @classmethod
+    def build(cls, data, mode: str = "ecb", chunk_size: int = DEFAULT_CHUNK_SIZE):
+        view = memoryview(data)
+        digests = [_digest(view[i:i + chunk_size]) for i in range(0, len(view), chunk_size)]
+        return cls(mode, chunk_size, len(view), digests)
+
+    def to_dict(self) -> dict:
+        return {
+            "version": 1,
+            "mode": self.mode,
+            "chunk_size": self.chunk_size,
+            "size": self.size,
+            "digests": [d.hex() for d in self.digests],
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        return cls(d["mode"], d["chunk_size"], d["size"], [bytes.fromhex(h) for h in d["digests"]])
+
+    def dumps(self) -> str:
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def loads(cls, s: str):
+        return cls.from_dict(json.loads(s))
+
+
+# -----------------------------
+# GHI ĐÈ CIPHERTEXT
+# -----------------------------
+
+class _Target:
+    """Ghi đè vào bytearray hoặc file mở chế độ r+b"""
+
+    def __init__(self, ciphertext):
+        self._buf = ciphertext if isinstance(ciphertext, bytearray) else None
+        self._f = None if self._buf is not None else ciphertext
+        if self._f is not None and not hasattr(self._f, "seek"):
+            raise TypeError("ciphertext phải là bytearray hoặc file có seek")
+
+    def read(self, offset, length):
+        if self._buf is not None:
+            return bytes(self._buf[offset:offset + length])
+        self._f.seek(offset)
+        return self._f.read(length)
+
+    def write(self, offset, data):
+        if self._buf is not None:
+            self._buf[offset:offset + len(data)] = data
+        else:
+            self._f.seek(offset)
+            self._f.write(data)
+
+    def resize(self, size):
+        if self._buf is not None:
+            if len(self._buf) > size:
+                del self._buf[size:]
+            else:
+                self._buf.extend(bytes(size - len(self._buf)))
+        else:
+            self._f.truncate(size)
+
+
+def _check(cipher, mode, chunk_size):
+    if mode not in _SUPPORTED:
+        raise ValueError(f"Delta chỉ hỗ trợ chế độ khối độc lập: {', '.join(_SUPPORTED)}")
+    if chunk_size <= 0 or chunk_size % cipher.block_size:
+        raise ValueError(f"chunk_size phải là bội số dương của {cipher.block_size}")
+
+
+# -----------------------------
+# API
+# -----------------------------
+
+def encrypt(cipher, data: bytes, mode: str = "ecb", chunk_size: int = DEFAULT_CHUNK_SIZE,
+            iv: bytes = None):
+    """
+    Mã hóa lần đầu, trả về (bytearray ciphertext, Manifest)
+    ecb: giống cipher.encrypt(data); ctr: giống modes.CTR(cipher, iv).encrypt(data)
+    """
+    mode = mode.lower()
+    _check(cipher, mode, chunk_size)
+    if mode == "ecb":
+        ct = cipher.encrypt(data)
+    else:
+        ct = modes.CTR(cipher, iv=iv or os.urandom(cipher.block_size)).encrypt(data)
+    return bytearray(ct), Manifest.build(data, mode, chunk_size)
+
+
+def reencrypt(cipher, manifest: Manifest, ciphertext, data: bytes):
+    """
+    Cập nhật ciphertext (bytearray hoặc file r+b) cho plaintext mới data,
+    chỉ mã hóa lại các chunk có digest khác manifest.
+    Trả về (Manifest mới, danh sách vùng plaintext [start, end) đã mã hóa lại)
+    """
+    mode, cs = manifest.mode, manifest.chunk_size
+    _check(cipher, mode, cs)
+    bs = cipher.block_size
+    target = _Target(ciphertext)
+    view = memoryview(data)
+    new = Manifest.build(view, mode, cs)
+    n, old_n = len(view), manifest.size
+
+    # Chunk giữ nguyên: đầy đủ trong cả hai bản (không chứa phần đuôi /
+    # padding) và digest trùng nhau
+    full = min(n, old_n) // cs
+    changed = [
+        i for i in range(full)
+        if i >= len(manifest.digests) or new.digests[i] != manifest.digests[i]
+    ]
+    # Phần đuôi [tail, n) (chunk lẻ + padding ECB): viết lại nếu độ dài đổi
+    # hoặc chunk lẻ cuối khác digest
+    tail = full * cs
+    if n != old_n or (
+        tail < n and (len(manifest.digests) <= full or new.digests[full] != manifest.digests[full])
+    ):
+        changed.append(None)
+
+    ranges = []
+    if mode == "ecb":
+        prefix = 0
+        if None in changed:
+            target.resize(n + bs - n % bs)
+        for i in changed:
+            if i is None:
+                ct = cipher.encrypt_blocks(modes.pad(bytes(view[tail:]), bs))
+                target.write(prefix + tail, ct)
+                ranges.append((tail, n))
+            else:
+                start = i * cs
+                target.write(prefix + start, cipher.encrypt_blocks(bytes(view[start:start + cs])))
+                ranges.append((start, start + cs))
+    else:
+        prefix = bs
+        ctr = modes.CTR(cipher, iv=target.read(0, bs))
+        if None in changed:
+            target.resize(prefix + n)
+        for i in changed:
+            start, end = (tail, n) if i is None else (i * cs, i * cs + cs)
+            if start == end:
+                continue
+            chunk = bytes(view[start:end])
+            target.write(prefix + start, modes.xor_bytes(chunk, ctr.keystream(start, len(chunk))))
+            ranges.append((start, end))
+
+    return new, _merge(ranges)
+
+
+def _merge(ranges):
+    out = []
+    for start, end in sorted(ranges):
+        if out and out[-1][1] >= start:
+            out[-1] = (out[-1][0], max(out[-1][1], end))
+        else:
+            out.append((start, end))
+    return out
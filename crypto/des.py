@@ -3,6 +3,10 @@
 # Academic demo – NOT for real security
 # =====================================================
 
+from .streaming import Encryptor, Decryptor
+from .buffers import BufferMixin
+from .keycache import cached_cipher
+
 # -----------------------------
 # PERMUTATION TABLES
 # -----------------------------
@@ -138,11 +142,316 @@ def unpad(data):
         raise ValueError("Invalid padding")
     return data[:-pad_len]
 
+# -----------------------------
+# BẢNG TRA CHO ENGINE SỐ NGUYÊN
+# -----------------------------
+
+def _byte_tables(table, in_bits):
+    """
+    Tách một phép hoán vị bit thành các bảng tra theo từng byte đầu vào:
+    permute(x) = OR của tables[k][byte thứ k của x]
+    """
+    out_bits = len(table)
+    tables = []
+    for k in range(in_bits // 8):
+        t = [0] * 256
+        for v in range(256):
+            acc = 0
+            for pos, src in enumerate(table):
+                byte, bit = divmod(src - 1, 8)
+                if byte == k and v & (0x80 >> bit):
+                    acc |= 1 << (out_bits - 1 - pos)
+            t[v] = acc
+        tables.append(t)
+    return tables
+
+
+def _permute_int(x, tables, in_bits):
+    acc = 0
+    shift = in_bits
+    for t in tables:
+        shift -= 8
+        acc |= t[(x >> shift) & 0xFF]
+    return acc
+
+
+_IP_TABLES = _byte_tables(IP, 64)
+_FP_TABLES = _byte_tables(FP, 64)
+_PC1_TABLES = _byte_tables(PC1, 64)
+_PC2_TABLES = _byte_tables(PC2, 56)
+
+# SP-box: S-box i gộp với hoán vị P, đầu vào 6 bit, đầu ra 32 bit
+SP = []
+for _i in range(8):
+    _t = []
+    for _v in range(64):
+        _row = ((_v >> 4) & 2) | (_v & 1)
+        _col = (_v >> 1) & 0xF
+        _s = SBOX[_i][_row][_col] << (28 - 4 * _i)
+        _p = 0
+        for _pos, _src in enumerate(P):
+            if _s & (1 << (32 - _src)):
+                _p |= 1 << (31 - _pos)
+        _t.append(_p)
+    SP.append(_t)
+del _i, _t, _v, _row, _col, _s, _p, _pos, _src
+
+_M28 = (1 << 28) - 1
+_M32 = 0xFFFFFFFF
+
+
+def _key_schedule(key: bytes):
+    """
+    16 khóa vòng, mỗi khóa tách sẵn thành 8 nhóm 6 bit (ứng với 8 S-box)
+    """
+    k = _permute_int(int.from_bytes(key, "big"), _PC1_TABLES, 64)
+    c, d = k >> 28, k & _M28
+    keys = []
+    for shift in SHIFT_TABLE:
+        c = ((c << shift) | (c >> (28 - shift))) & _M28
+        d = ((d << shift) | (d >> (28 - shift))) & _M28
+        sub = _permute_int((c << 28) | d, _PC2_TABLES, 56)
+        keys.append(tuple((sub >> (42 - 6 * i)) & 0x3F for i in range(8)))
+    return keys
+
+
+def _rounds(left, right, keys):
+    """
+    Các vòng Feistel trên 2 nửa 32-bit (không gồm IP/FP, không hoán đổi cuối)
+    E-expansion được thay bằng việc đọc các cửa sổ 6 bit chồng nhau của
+    x = R32 || R1..R32 || R1
+    """
+    S0, S1, S2, S3, S4, S5, S6, S7 = SP
+    for k0, k1, k2, k3, k4, k5, k6, k7 in keys:
+        x = ((right & 1) << 33) | (right << 1) | (right >> 31)
+        left, right = right, left ^ (
+            S0[((x >> 28) & 0x3F) ^ k0] ^ S1[((x >> 24) & 0x3F) ^ k1]
+            ^ S2[((x >> 20) & 0x3F) ^ k2] ^ S3[((x >> 16) & 0x3F) ^ k3]
+            ^ S4[((x >> 12) & 0x3F) ^ k4] ^ S5[((x >> 8) & 0x3F) ^ k5]
+            ^ S6[((x >> 4) & 0x3F) ^ k6] ^ S7[(x & 0x3F) ^ k7]
+        )
+    return left, right
+
+
+def _ip(x):
+    return _permute_int(x, _IP_TABLES, 64)
+
+
+def _fp(x):
+    return _permute_int(x, _FP_TABLES, 64)
+
+
+def _crypt_block(block, keys):
+    x = _ip(int.from_bytes(block, "big"))
+    left, right = _rounds(x >> 32, x & _M32, keys)
+    return _fp((right << 32) | left).to_bytes(8, "big")
+
+
+# -----------------------------
+# BITSLICED DES (nhiều khối mỗi lượt)
+# -----------------------------
+# Mỗi bit của khối (64 vị trí) là một số nguyên lớn; bit thứ j của số
+# nguyên đó thuộc về khối thứ j. Các phép hoán vị (IP, FP, E, P) chỉ là
+# đổi chỗ phần tử trong list, còn S-box được tính bằng mạng cổng logic.
+# Như vậy 1 lượt 16 vòng mã hóa cùng lúc tất cả các khối trong batch.
+
+# Với mỗi S-box và mỗi bit ra: danh sách đầu vào 6 bit làm bit đó bằng 1
+_BS_ONES = []
+for _i in range(8):
+    _outs = []
+    for _o in range(4):
+        _outs.append([
+            _v for _v in range(64)
+            if SBOX[_i][((_v >> 4) & 2) | (_v & 1)][(_v >> 1) & 0xF] & (8 >> _o)
+        ])
+    _BS_ONES.append(_outs)
+del _i, _outs, _o
+
+_E_IDX = [j - 1 for j in E]
+_P_IDX = [j - 1 for j in P]
+_IP_IDX = [j - 1 for j in IP]
+_FP_IDX = [j - 1 for j in FP]
+
+
+def _bs_sbox(ones, a, full):
+    """
+    S-box dạng cổng logic: tổng (XOR) các minterm 6 biến
+    a: 6 số nguyên bitsliced (bit cao nhất trước)
+    """
+    a0, a1, a2, a3, a4, a5 = a
+    n0, n1, n2, n3, n4, n5 = (x ^ full for x in a)
+    p = (n0 & n1, n0 & a1, a0 & n1, a0 & a1)
+    lo = (p[0] & n2, p[0] & a2, p[1] & n2, p[1] & a2,
+          p[2] & n2, p[2] & a2, p[3] & n2, p[3] & a2)
+    p = (n3 & n4, n3 & a4, a3 & n4, a3 & a4)
+    hi = (p[0] & n5, p[0] & a5, p[1] & n5, p[1] & a5,
+          p[2] & n5, p[2] & a5, p[3] & n5, p[3] & a5)
+    m = [l & h for l in lo for h in hi]
+    out = []
+    for vs in ones:
+        acc = 0
+        for v in vs:
+            acc ^= m[v]
+        out.append(acc)
+    return out
+
+
+def _bs_key_bits(keys):
+    """Khóa vòng (8 nhóm 6 bit) → danh sách 48 bit cho mỗi vòng"""
+    return [
+        [(chunk >> (5 - t)) & 1 for chunk in k for t in range(6)]
+        for k in keys
+    ]
+
+
+def _bs_des(cols, key_bits, full):
+    """Một lần DES (IP, 16 vòng, FP) trên 64 cột bitsliced"""
+    bits = [cols[j] for j in _IP_IDX]
+    left, right = bits[:32], bits[32:]
+    for kb in key_bits:
+        e = [right[j] ^ full if b else right[j] for j, b in zip(_E_IDX, kb)]
+        s = []
+        for i in range(8):
+            s.extend(_bs_sbox(_BS_ONES[i], e[6 * i:6 * i + 6], full))
+        left, right = right, [l ^ s[j] for l, j in zip(left, _P_IDX)]
+    pre = right + left
+    return [pre[j] for j in _FP_IDX]
+
+
+def _bs_transpose(data, groups):
+    """
+    Chuyển các khối 8 byte thành 64 cột bitsliced.
+    Dữ liệu chia làm `groups` (≤ 8) nhóm; mỗi byte của cột chứa 1 bit
+    của 8 nhóm → các số nguyên được dùng hết 8 bit/byte.
+    """
+    n = len(data) // groups
+    lane = int.from_bytes(b"\x01" * (n // 8), "big")
+    cols = [0] * 64
+    for g in range(groups):
+        chunk = data[g * n:(g + 1) * n]
+        for k in range(8):
+            v = int.from_bytes(chunk[k::8], "big")
+            for b in range(8):
+                cols[8 * k + b] |= ((v >> (7 - b)) & lane) << g
+    return cols
+
+
+def _bs_untranspose(cols, groups, n):
+    """Ngược lại _bs_transpose: n = số byte mỗi nhóm"""
+    lane = int.from_bytes(b"\x01" * (n // 8), "big")
+    out = bytearray(n * groups)
+    for g in range(groups):
+        view = memoryview(out)[g * n:(g + 1) * n]
+        for k in range(8):
+            acc = 0
+            for b in range(8):
+                acc |= ((cols[8 * k + b] >> g) & lane) << (7 - b)
+            view[k::8] = acc.to_bytes(n // 8, "big")
+    return bytes(out)
+
+
+# Dưới ngưỡng này (bytes) engine SP-box từng khối nhanh hơn
+BITSLICE_THRESHOLD = 2048
+# Số khối tối đa mỗi lượt bitsliced (giới hạn kích thước số nguyên)
+BITSLICE_BATCH = 1 << 15
+
+
+def bitslice_crypt(data: bytes, schedules) -> bytes:
+    """
+    ECB thô trên nhiều khối cùng lúc.
+    schedules: danh sách khóa vòng cho các lần DES nối tiếp
+    (1 phần tử cho DES, 3 phần tử cho 3DES EDE) – không cần chuyển
+    đổi qua lại giữa các lần DES.
+    len(data) phải là bội số 8.
+    """
+    if len(data) % 8:
+        raise ValueError("Dữ liệu không phải bội số 8 bytes")
+    key_bits = [_bs_key_bits(keys) for keys in schedules]
+    out = []
+    for start in range(0, len(data), BITSLICE_BATCH * 8):
+        chunk = data[start:start + BITSLICE_BATCH * 8]
+        nblocks = len(chunk) // 8
+        # Số khối mỗi nhóm phải như nhau → đệm khối 0 rồi bỏ đi
+        per_group = -(-nblocks // 8)
+        padded = bytes(chunk) + bytes((per_group * 8 - nblocks) * 8)
+        n = per_group * 8
+        full = (1 << (8 * per_group)) - 1
+        cols = _bs_transpose(padded, 8)
+        for kb in key_bits:
+            cols = _bs_des(cols, kb, full)
+        out.append(_bs_untranspose(cols, 8, n)[:len(chunk)])
+    return b"".join(out)
+
+
 # -----------------------------
 # DES CLASS
 # -----------------------------
 
-class DES:
+class DES(BufferMixin):
+    """
+    DES dùng số nguyên
+    - Mỗi nửa khối là số nguyên 32-bit
+    - IP, FP, PC1, PC2 tra bảng theo byte
+    - S-box và P gộp thành bảng SP 32-bit
+    Kết quả giống hệt DESReference
+    """
+    block_size = 8
+
+    def __init__(self, key: bytes):
+        if len(key) != 8:
+            raise ValueError("DES key must be 8 bytes")
+        self.round_keys = _key_schedule(key)
+        self.inv_round_keys = self.round_keys[::-1]
+
+    def encrypt_block(self, block: bytes) -> bytes:
+        return _crypt_block(block, self.round_keys)
+
+    def decrypt_block(self, block: bytes) -> bytes:
+        return _crypt_block(block, self.inv_round_keys)
+
+    def encrypt_blocks(self, data: bytes) -> bytes:
+        """ECB thô (không padding) – len(data) phải là bội số 8"""
+        if len(data) % 8:
+            raise ValueError("Dữ liệu không phải bội số 8 bytes")
+        keys = self.round_keys
+        if len(data) >= BITSLICE_THRESHOLD:
+            return bitslice_crypt(data, [keys])
+        return b''.join(_crypt_block(data[i:i+8], keys) for i in range(0, len(data), 8))
+
+    def decrypt_blocks(self, data: bytes) -> bytes:
+        if len(data) % 8:
+            raise ValueError("Dữ liệu không phải bội số 8 bytes")
+        keys = self.inv_round_keys
+        if len(data) >= BITSLICE_THRESHOLD:
+            return bitslice_crypt(data, [keys])
+        return b''.join(_crypt_block(data[i:i+8], keys) for i in range(0, len(data), 8))
+
+    def encrypt(self, data: bytes) -> bytes:
+        return self.encrypt_blocks(pad(data))
+
+    def decrypt(self, data: bytes) -> bytes:
+        return unpad(self.decrypt_blocks(data))
+
+    def encryptor(self) -> Encryptor:
+        """Ngữ cảnh mã hóa dạng luồng (update/finalize)"""
+        return Encryptor(self)
+
+    def decryptor(self) -> Decryptor:
+        """Ngữ cảnh giải mã dạng luồng (update/finalize)"""
+        return Decryptor(self)
+
+
+# -----------------------------
+# DES CLASS (BẢN GỐC DÙNG CHUỖI BIT – GIỮ LÀM THAM CHIẾU)
+# -----------------------------
+
+class DESReference(BufferMixin):
+    """
+    DES gốc: khóa và khối lưu dưới dạng chuỗi '0'/'1'
+    Chậm – chỉ giữ lại để đối chiếu kết quả với engine số nguyên
+    """
+    block_size = 8
+
     def __init__(self, key: bytes):
         if len(key) != 8:
             raise ValueError("DES key must be 8 bytes")
@@ -186,13 +495,26 @@ class DES:
         final_bits = permute(right + left, FP)
         return int(final_bits, 2).to_bytes(8, 'big')
 
-    def encrypt(self, data: bytes) -> bytes:
-        data = pad(data)
+    def encrypt_blocks(self, data: bytes) -> bytes:
+        """ECB thô (không padding) – len(data) phải là bội số 8"""
         return b''.join(self.encrypt_block(data[i:i+8]) for i in range(0, len(data), 8))
 
+    def decrypt_blocks(self, data: bytes) -> bytes:
+        return b''.join(self.decrypt_block(data[i:i+8]) for i in range(0, len(data), 8))
+
+    def encrypt(self, data: bytes) -> bytes:
+        return self.encrypt_blocks(pad(data))
+
     def decrypt(self, data: bytes) -> bytes:
-        out = b''.join(self.decrypt_block(data[i:i+8]) for i in range(0, len(data), 8))
-        return unpad(out)
+        return unpad(self.decrypt_blocks(data))
+
+    def encryptor(self) -> Encryptor:
+        """Ngữ cảnh mã hóa dạng luồng (update/finalize)"""
+        return Encryptor(self)
+
+    def decryptor(self) -> Decryptor:
+        """Ngữ cảnh giải mã dạng luồng (update/finalize)"""
+        return Decryptor(self)
 
 # -----------------------------
 # API FOR app.py
@@ -201,12 +523,14 @@ class DES:
 def encrypt(data: bytes, key: str) -> bytes:
     if len(key.encode()) != 8:
         raise ValueError("❌ DES key phải đúng 8 ký tự")
-    return DES(key.encode()).encrypt(data)
+    with cached_cipher(DES, key.encode()) as cipher:
+        return cipher.encrypt(data)
 
 def decrypt(data: bytes, key: str) -> bytes:
     if len(key.encode()) != 8:
         raise ValueError("❌ DES key phải đúng 8 ký tự")
-    return DES(key.encode()).decrypt(data)
+    with cached_cipher(DES, key.encode()) as cipher:
+        return cipher.decrypt(data)
 
 
 def normalize_key(key: str) -> bytes:
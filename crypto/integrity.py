@@ -0,0 +1,254 @@
+# =====================================================
+# MANIFEST TOÀN VẸN DẠNG CÂY MERKLE (SIDECAR)
+# =====================================================
+# File được chia chunk cố định; mỗi chunk → lá SHA-256, các lá gộp thành
+# gốc Merkle. Manifest (lá + gốc) lưu ở file cạnh bên "<file>.merkle.json".
+#
+#   lá   = SHA256(0x00 || chunk)
+#   nút  = SHA256(0x01 || trái || phải)     (nút lẻ cuối tầng được đẩy lên)
+#
+# - TreeHasher: tính manifest trong cùng lượt ghi / mã hóa (update/finalize)
+# - verify(): kiểm tra song song bằng thread pool – hashlib và os.pread
+#   nhả GIL nên các chunk được băm thật sự song song (Windows không có
+#   os.pread: mỗi thread mở file riêng và dùng seek + read)
+# - verify(ranges=...): chỉ kiểm tra lại các chunk phủ vùng byte đã sửa
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+SIDECAR_SUFFIX = ".merkle.json"
+
+_LEAF = b"\x00"
+_NODE = b"\x01"
+
+
+def _leaf(data) -> bytes:
+    h = hashlib.sha256(_LEAF)
+    h.update(data)
+    return h.digest()
+
+
+def merkle_root(leaves) -> bytes:
+    """Gốc Merkle từ danh sách lá (rỗng → SHA256 của chuỗi rỗng)"""
+    level = list(leaves)
+    if not level:
+        return hashlib.sha256(b"").digest()
+    while len(level) > 1:
+        nxt = [
+            hashlib.sha256(_NODE + level[i] + level[i + 1]).digest()
+            for i in range(0, len(level) - 1, 2)
+        ]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+    return level[0]
+
+
+def sidecar_path(path: str) -> str:
+    return path + SIDECAR_SUFFIX
+
+
+class Manifest:
+    """
+    Kích thước chunk, kích thước file, các lá và gốc Merkle
+    """
+
+    def __init__(self, chunk_size: int, size: int, leaves, root: bytes = None):
+        self.chunk_size = chunk_size
+        self.size = size
+        self.leaves = list(leaves)
+        self.root = root if root is not None else merkle_root(self.leaves)
+
+    def to_dict(self) -> dict:
+        return {
+            "version": 1,
+            "algorithm": "sha256",
+            "chunk_size": self.chunk_size,
+            "size": self.size,
+            "root": self.root.hex(),
+            "leaves": [leaf.hex() for leaf in self.leaves],
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        if d.get("algorithm") != "sha256":
+            raise ValueError("Manifest dùng thuật toán băm không hỗ trợ")
+        return cls(d["chunk_size"], d["size"], [bytes.fromhex(h) for h in d["leaves"]],
+                   bytes.fromhex(d["root"]))
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+class TreeHasher:
+    """
+    Băm tăng dần cùng lúc với ghi dữ liệu
+    ----------------------------------------
+        hasher = TreeHasher()
+        for chunk in encryptor_output: f.write(chunk); hasher.update(chunk)
+        hasher.finalize().save(sidecar_path(path))
+    """
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size không hợp lệ")
+        self.chunk_size = chunk_size
+        self._leaves = []
+        self._buf = bytearray()
+        self._size = 0
+
+    def update(self, data: bytes):
+        self._size += len(data)
+        buf = self._buf
+        view = memoryview(data)
+        cs = self.chunk_size
+        if buf:
+            take = cs - len(buf)
+            buf += view[:take]
+            view = view[take:]
+            if len(buf) < cs:
+                return
+            self._leaves.append(_leaf(buf))
+            buf.clear()
+        n = len(view) - len(view) % cs
+        for i in range(0, n, cs):
+            self._leaves.append(_leaf(view[i:i + cs]))
+        buf += view[n:]
+
+    def finalize(self) -> Manifest:
+        if self._buf:
+            self._leaves.append(_leaf(self._buf))
+            self._buf.clear()
+        return Manifest(self.chunk_size, self._size, self._leaves)
+
+
+# -----------------------------
+# BĂM / KIỂM TRA SONG SONG
+# -----------------------------
+
+def _hash_chunks(path, chunk_size, indices, workers):
+    """
+    {chỉ số chunk: lá} – mỗi thread đọc bằng os.pread trên cùng fd;
+    không có os.pread (Windows) thì mỗi lần đọc mở file riêng, seek + read
+    """
+    max_workers = workers or min(32, (os.cpu_count() or 1) + 4)
+    if not hasattr(os, "pread"):
+        def job(i):
+            with open(path, "rb") as f:
+                f.seek(i * chunk_size)
+                return i, _leaf(f.read(chunk_size))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return dict(pool.map(job, indices))
+
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        def job(i):
+            return i, _leaf(os.pread(fd, chunk_size, i * chunk_size))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return dict(pool.map(job, indices))
+    finally:
+        os.close(fd)
+
+
+def build(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, workers: int = None) -> Manifest:
+    """Tính manifest cho file đã có (song song)"""
+    size = os.path.getsize(path)
+    n = -(-size // chunk_size)
+    leaves = _hash_chunks(path, chunk_size, range(n), workers)
+    return Manifest(chunk_size, size, [leaves[i] for i in range(n)])
+
+
+def _chunks_for(ranges, chunk_size, n):
+    out = set()
+    for start, end in ranges:
+        if end <= start:
+            continue
+        out.update(range(start // chunk_size, min(n, (end - 1) // chunk_size + 1)))
+    return sorted(out)
+
+
+def verify(path: str, manifest: Manifest = None, workers: int = None, ranges=None):
+    """
+    Kiểm tra file theo manifest (mặc định đọc từ sidecar)
+    ranges: [(start, end), ...] – chỉ kiểm tra các chunk phủ những vùng này
+    Trả về danh sách chỉ số chunk hỏng (rỗng = toàn vẹn).
+    Sai kích thước file hoặc gốc Merkle không khớp các lá → ValueError.
+    """
+    if manifest is None:
+        manifest = Manifest.load(sidecar_path(path))
+    if merkle_root(manifest.leaves) != manifest.root:
+        raise ValueError("Manifest không nhất quán: gốc Merkle không khớp các lá")
+    if os.path.getsize(path) != manifest.size:
+        raise ValueError("Kích thước file khác manifest")
+    n = len(manifest.leaves)
+    if n != -(-manifest.size // manifest.chunk_size):
+        raise ValueError("Manifest không nhất quán: số lá sai")
+    indices = range(n) if ranges is None else _chunks_for(ranges, manifest.chunk_size, n)
+    leaves = _hash_chunks(path, manifest.chunk_size, indices, workers)
+    return [i for i in indices if leaves[i] != manifest.leaves[i]]
+
+
+def update(path: str, manifest: Manifest, ranges, workers: int = None) -> Manifest:
+    """
+    Cập nhật manifest sau khi sửa các vùng ranges của file (vd. crypto.delta)
+    Chỉ băm lại các chunk bị chạm tới; kích thước đổi thì băm lại chunk cuối cũ.
+    """
+    size = os.path.getsize(path)
+    cs = manifest.chunk_size
+    n = -(-size // cs)
+    leaves = manifest.leaves[:n]
+    touched = set(_chunks_for(ranges, cs, n))
+    if size != manifest.size:
+        touched.update(range(min(manifest.size, size) // cs, n))
+    touched.update(range(len(leaves), n))
+    fresh = _hash_chunks(path, cs, sorted(touched), workers)
+    leaves += [None] * (n - len(leaves))
+    for i, leaf in fresh.items():
+        leaves[i] = leaf
+    return Manifest(cs, size, leaves)
+
+
+# -----------------------------
+# QUÉT THƯ MỤC: python -m crypto.integrity outputs/
+# -----------------------------
+
+def sweep(directory: str, workers: int = None) -> dict:
+    """Kiểm tra mọi file có sidecar trong thư mục, trả về {file: lỗi}"""
+    problems = {}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not name.endswith(SIDECAR_SUFFIX):
+                continue
+            path = os.path.join(root, name[:-len(SIDECAR_SUFFIX)])
+            try:
+                bad = verify(path, workers=workers)
+            except (OSError, ValueError, KeyError) as e:
+                problems[path] = str(e)
+            else:
+                if bad:
+                    problems[path] = f"chunk hỏng: {bad}"
+    return problems
+
+
+if __name__ == "__main__":
+    import sys
+
+    problems = {}
+    for d in sys.argv[1:] or ["outputs"]:
+        problems.update(sweep(d))
+    for path, err in problems.items():
+        print(f"❌ {path}: {err}")
+    print("✅ Toàn vẹn" if not problems else f"{len(problems)} file có lỗi")
+    sys.exit(1 if problems else 0)
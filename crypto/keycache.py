@@ -0,0 +1,161 @@
+# =====================================================
+# CACHE KEY SCHEDULE DÙNG CHUNG CHO AES / DES / 3DES
+# =====================================================
+# Các hàm module-level (aes.encrypt, des.encrypt, ...) tạo cipher mới cho
+# mỗi request → chạy lại key_expansion / _generate_keys. Cache này giữ lại
+# đối tượng cipher (kèm key schedule và các bảng dẫn xuất như bảng GHASH,
+# khóa giải mã T-table) theo khóa, giới hạn số lượng và thời gian sống.
+
+import os
+import hmac
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+def _zeroize(obj, seen=None):
+    """
+    Xóa (best-effort) dữ liệu khóa trong đối tượng cipher:
+    list → ghi đè 0, bytearray → 0, mảng NumPy → fill(0),
+    đối tượng con (vd. des1/des2/des3 của TripleDES) → đệ quy
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return
+    seen.add(id(obj))
+
+    if isinstance(obj, list):
+        for i, item in enumerate(obj):
+            _zeroize(item, seen)
+            obj[i] = 0
+    elif isinstance(obj, bytearray):
+        obj[:] = bytes(len(obj))
+    elif hasattr(obj, "fill") and hasattr(obj, "dtype"):
+        obj.fill(0)
+    elif hasattr(obj, "__dict__"):
+        for value in vars(obj).values():
+            _zeroize(value, seen)
+
+
+class _Entry:
+    __slots__ = ("cipher", "expires", "refs", "evicted")
+
+    def __init__(self, cipher, expires):
+        self.cipher = cipher
+        self.expires = expires
+        self.refs = 0
+        self.evicted = False
+
+
+class KeyScheduleCache:
+    """
+    LRU cache các đối tượng cipher đã mở rộng khóa
+    ----------------------------------------
+    - Khóa cache = (tên lớp, HMAC-SHA256(bí mật ngẫu nhiên của process, key))
+      → không lưu khóa gốc trong cache
+    - Giới hạn maxsize phần tử và ttl giây kể từ lúc tạo
+    - Bộ đếm hits / misses / evictions
+    - Phần tử bị loại được xóa trắng (zeroize); nếu đang được dùng
+      thì chờ tới khi trả lại mới xóa
+    """
+
+    def __init__(self, maxsize: int = 64, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._secret = os.urandom(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cache_key(self, cls, key):
+        digest = hmac.new(self._secret, key, hashlib.sha256).digest()
+        return (cls.__module__, cls.__qualname__, digest)
+
+    def _evict(self, ck):
+        entry = self._entries.pop(ck)
+        entry.evicted = True
+        self.evictions += 1
+        if entry.refs == 0:
+            _zeroize(entry.cipher)
+
+    def _purge_expired(self, now):
+        for ck in [ck for ck, e in self._entries.items() if e.expires <= now]:
+            self._evict(ck)
+
+    def _acquire(self, cls, key):
+        ck = self._cache_key(cls, key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(ck)
+            if entry is not None and entry.expires <= now:
+                self._evict(ck)
+                entry = None
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(ck)
+                entry.refs += 1
+                return entry
+            self.misses += 1
+
+        # Mở rộng khóa ngoài lock – có thể tốn thời gian
+        entry = _Entry(cls(key), now + self.ttl)
+        entry.refs += 1
+        with self._lock:
+            if ck in self._entries:
+                self._evict(ck)
+            self._entries[ck] = entry
+            self._purge_expired(now)
+            while len(self._entries) > self.maxsize:
+                self._evict(next(iter(self._entries)))
+        return entry
+
+    def _release(self, entry):
+        with self._lock:
+            entry.refs -= 1
+            if entry.evicted and entry.refs == 0:
+                _zeroize(entry.cipher)
+
+    @contextmanager
+    def cipher(self, cls, key: bytes):
+        """
+        Mượn đối tượng cipher cls(key) từ cache:
+
+            with cache.cipher(AESTTable, key) as c:
+                c.encrypt(data)
+        """
+        entry = self._acquire(cls, key)
+        try:
+            yield entry.cipher
+        finally:
+            self._release(entry)
+
+    def clear(self):
+        """Loại (và xóa trắng) toàn bộ phần tử"""
+        with self._lock:
+            for ck in list(self._entries):
+                self._evict(ck)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Cache dùng chung cho các hàm module-level
+default_cache = KeyScheduleCache()
+
+
+def cached_cipher(cls, key: bytes):
+    """Mượn cipher từ cache mặc định (dùng với with)"""
+    return default_cache.cipher(cls, key)
@@ -0,0 +1,309 @@
+# =====================================================
+# CÁC CHẾ ĐỘ HOẠT ĐỘNG DÙNG CHUNG (ECB / CBC / CFB / OFB / CTR)
+# Áp dụng cho mọi cipher có block_size, encrypt_block, decrypt_block
+# (AES, DES, TripleDES...)
+# =====================================================
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+# -----------------------------
+# HELPER
+# -----------------------------
+
+def xor_bytes(a, b):
+    """XOR hai chuỗi bytes cùng độ dài (qua số nguyên lớn)"""
+    n = len(a)
+    return (int.from_bytes(a, "big") ^ int.from_bytes(b[:n], "big")).to_bytes(n, "big")
+
+
+def pad(data, block_size):
+    """PKCS#7"""
+    pad_len = block_size - (len(data) % block_size)
+    return data + bytes([pad_len] * pad_len)
+
+
+def unpad(data, block_size):
+    if not data:
+        raise ValueError("Data is empty")
+    pad_len = data[-1]
+    if pad_len < 1 or pad_len > block_size:
+        raise ValueError(f"Invalid padding length: {pad_len}")
+    if data[-pad_len:] != bytes([pad_len] * pad_len):
+        raise ValueError("Invalid padding bytes")
+    return data[:-pad_len]
+
+
+def _encrypt_blocks(cipher, data):
+    fn = getattr(cipher, "encrypt_blocks", None)
+    if fn is not None:
+        return fn(data)
+    bs = cipher.block_size
+    return b"".join(cipher.encrypt_block(data[i:i + bs]) for i in range(0, len(data), bs))
+
+
+def _decrypt_blocks(cipher, data):
+    fn = getattr(cipher, "decrypt_blocks", None)
+    if fn is not None:
+        return fn(data)
+    bs = cipher.block_size
+    return b"".join(cipher.decrypt_block(data[i:i + bs]) for i in range(0, len(data), bs))
+
+
+def _segment_job(args):
+    """Chạy trong process con: ECB thô trên 1 đoạn"""
+    cipher, decrypt, data = args
+    return _decrypt_blocks(cipher, data) if decrypt else _encrypt_blocks(cipher, data)
+
+
+class _Mode:
+    """
+    Lớp cơ sở: giữ cipher, block_size, IV, process pool
+    encrypt() trả về IV || ciphertext, decrypt() nhận IV || ciphertext
+
+    - Không truyền iv: mỗi lần encrypt() dùng IV ngẫu nhiên mới
+      (self.iv = IV của lần encrypt gần nhất)
+    - Truyền iv: chỉ được encrypt() một lần – CTR / OFB dùng lại IV là
+      dùng lại keystream
+    - decrypt() dùng IV đọc từ dữ liệu, không ghi đè self.iv
+    - Process pool (workers > 1) giữ lại giữa các lần gọi, giải phóng
+      bằng close() hoặc with
+    """
+    name = None
+
+    # Số khối tối thiểu mỗi process khi chia song song
+    parallel_threshold = 1 << 12
+
+    def __init__(self, cipher, iv: bytes = None, workers: int = 1):
+        self.cipher = cipher
+        self.block_size = cipher.block_size
+        self._iv_fixed = iv is not None
+        if iv is None:
+            iv = os.urandom(self.block_size)
+        if len(iv) != self.block_size:
+            raise ValueError(f"IV phải đúng {self.block_size} bytes")
+        self.iv = iv
+        self._iv_used = False
+        self.workers = workers
+        self._pool = None
+
+    def _next_iv(self):
+        """IV cho một lần encrypt() – không bao giờ dùng lại"""
+        if self._iv_used:
+            if self._iv_fixed:
+                raise ValueError("IV do người gọi truyền vào chỉ dùng cho một lần encrypt()")
+            self.iv = os.urandom(self.block_size)
+        self._iv_used = True
+        return self.iv
+
+    # -----------------------------
+    # POOL
+    # -----------------------------
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _batch(self, data, decrypt):
+        """
+        ECB thô trên nhiều khối độc lập – chia cho process pool nếu đủ lớn
+        """
+        bs = self.block_size
+        nblocks = len(data) // bs
+        if self.workers <= 1 or nblocks < self.parallel_threshold * 2:
+            return _segment_job((self.cipher, decrypt, data))
+        step = -(-nblocks // self.workers) * bs
+        jobs = [(self.cipher, decrypt, data[i:i + step]) for i in range(0, len(data), step)]
+        return b"".join(self._get_pool().map(_segment_job, jobs))
+
+    def _split_iv(self, data):
+        """(IV, ciphertext) – IV chỉ dùng cho lần giải mã này"""
+        bs = self.block_size
+        if len(data) < bs:
+            raise ValueError("Dữ liệu quá ngắn (thiếu IV)")
+        return data[:bs], data[bs:]
+
+
+# -----------------------------
+# ECB
+# -----------------------------
+
+class ECB(_Mode):
+    """ECB + PKCS#7 (không dùng IV)"""
+    name = "ecb"
+
+    def __init__(self, cipher, iv: bytes = None, workers: int = 1):
+        self.cipher = cipher
+        self.block_size = cipher.block_size
+        self.iv = b""
+        self.workers = workers
+        self._pool = None
+
+    def encrypt(self, data: bytes) -> bytes:
+        return self._batch(pad(data, self.block_size), decrypt=False)
+
+    def decrypt(self, data: bytes) -> bytes:
+        if not data or len(data) % self.block_size:
+            raise ValueError(f"Dữ liệu không phải bội số {self.block_size} bytes")
+        return unpad(self._batch(data, decrypt=True), self.block_size)
+
+
+# -----------------------------
+# CBC
+# -----------------------------
+
+class CBC(_Mode):
+    """
+    CBC + PKCS#7
+        C_i = E(P_i XOR C_{i-1}),  C_0 = IV
+        P_i = D(C_i) XOR C_{i-1}
+
+    Mã hóa tuần tự; giải mã song song vì mỗi khối chỉ phụ thuộc ciphertext.
+    """
+    name = "cbc"
+
+    def encrypt(self, data: bytes) -> bytes:
+        bs, enc = self.block_size, self.cipher.encrypt_block
+        data = pad(data, bs)
+        prev = iv = self._next_iv()
+        out = [iv]
+        for i in range(0, len(data), bs):
+            prev = enc(xor_bytes(data[i:i + bs], prev))
+            out.append(prev)
+        return b"".join(out)
+
+    def decrypt(self, data: bytes) -> bytes:
+        bs = self.block_size
+        iv, ct = self._split_iv(data)
+        if not ct or len(ct) % bs:
+            raise ValueError(f"Dữ liệu không phải bội số {bs} bytes")
+        raw = self._batch(ct, decrypt=True)
+        return unpad(xor_bytes(raw, iv + ct[:-bs]), bs)
+
+
+# -----------------------------
+# CFB (full-block)
+# -----------------------------
+
+class CFB(_Mode):
+    """
+    CFB (phản hồi cả khối), không padding
+        C_i = P_i XOR E(C_{i-1})
+
+    Giải mã song song: E(IV || C_1 .. C_{n-1}) tính được một lượt.
+    """
+    name = "cfb"
+
+    def encrypt(self, data: bytes) -> bytes:
+        bs, enc = self.block_size, self.cipher.encrypt_block
+        prev = iv = self._next_iv()
+        out = [iv]
+        for i in range(0, len(data), bs):
+            chunk = data[i:i + bs]
+            prev = xor_bytes(chunk, enc(prev))
+            out.append(prev)
+        return b"".join(out)
+
+    def decrypt(self, data: bytes) -> bytes:
+        bs = self.block_size
+        iv, ct = self._split_iv(data)
+        # Khối phản hồi: IV, C_1, ..., C_{n-1}
+        nblocks = -(-len(ct) // bs)
+        feedback = (iv + ct)[:nblocks * bs]
+        stream = self._batch(feedback, decrypt=False)
+        return xor_bytes(ct, stream)
+
+
+# -----------------------------
+# OFB
+# -----------------------------
+
+class OFB(_Mode):
+    """
+    OFB, không padding
+        O_i = E(O_{i-1}),  O_0 = IV
+        C_i = P_i XOR O_i
+    Keystream phải sinh tuần tự; mã hóa và giải mã giống nhau.
+    """
+    name = "ofb"
+
+    def _keystream(self, length, iv):
+        bs, enc = self.block_size, self.cipher.encrypt_block
+        o = iv
+        out = []
+        for _ in range(-(-length // bs)):
+            o = enc(o)
+            out.append(o)
+        return b"".join(out)
+
+    def encrypt(self, data: bytes) -> bytes:
+        iv = self._next_iv()
+        return iv + xor_bytes(data, self._keystream(len(data), iv))
+
+    def decrypt(self, data: bytes) -> bytes:
+        iv, ct = self._split_iv(data)
+        return xor_bytes(ct, self._keystream(len(ct), iv))
+
+
+# -----------------------------
+# CTR
+# -----------------------------
+
+class CTR(_Mode):
+    """
+    CTR, không padding
+        khối đếm = IV + i  (cộng theo số nguyên big-endian, modulo 2^(8*bs))
+        C_i = P_i XOR E(khối đếm i)
+    Mọi khối độc lập → mã hóa và giải mã đều song song.
+    """
+    name = "ctr"
+
+    def keystream(self, offset: int, length: int, iv: bytes = None) -> bytes:
+        """Keystream cho vùng byte [offset, offset + length) (iv mặc định self.iv)"""
+        if length <= 0:
+            return b""
+        bs = self.block_size
+        first = offset // bs
+        count = (offset + length - 1) // bs - first + 1
+        base = int.from_bytes(self.iv if iv is None else iv, "big")
+        mask = (1 << (8 * bs)) - 1
+        counters = b"".join(
+            ((base + i) & mask).to_bytes(bs, "big") for i in range(first, first + count)
+        )
+        skip = offset - first * bs
+        return self._batch(counters, decrypt=False)[skip:skip + length]
+
+    def encrypt(self, data: bytes) -> bytes:
+        iv = self._next_iv()
+        return iv + xor_bytes(data, self.keystream(0, len(data), iv))
+
+    def decrypt(self, data: bytes) -> bytes:
+        iv, ct = self._split_iv(data)
+        return xor_bytes(ct, self.keystream(0, len(ct), iv))
+
+
+MODES = {m.name: m for m in (ECB, CBC, CFB, OFB, CTR)}
+
+
+def new(cipher, mode: str, iv: bytes = None, workers: int = 1):
+    """
+    Tạo đối tượng chế độ theo tên: new(DES(key), "cbc")
+    """
+    try:
+        cls = MODES[mode.lower()]
+    except KeyError:
+        raise ValueError(f"Chế độ chưa được hỗ trợ: {mode}")
+    return cls(cipher, iv=iv, workers=workers)
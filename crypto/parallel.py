@@ -0,0 +1,147 @@
+# =====================================================
+# MÃ HÓA ECB SONG SONG NHIỀU PROCESS (SHARED MEMORY)
+# =====================================================
+# ECB: mỗi khối độc lập → chia buffer thành các đoạn (bội số block_size)
+# và giao cho process pool. Dữ liệu vào/ra đi qua multiprocessing
+# shared_memory, không pickle nội dung.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from .keycache import cached_cipher
+
+
+def _segment_worker(cls, key, in_name, out_name, start, end, decrypt):
+    """
+    Chạy trong process con: ECB thô trên đoạn [start, end)
+    Cipher lấy từ cache key schedule của chính process con
+    """
+    # Process con dùng chung resource tracker với process cha,
+    # vùng nhớ chỉ được unlink bởi process cha
+    src = shared_memory.SharedMemory(name=in_name)
+    dst = shared_memory.SharedMemory(name=out_name)
+    try:
+        with cached_cipher(cls, key) as cipher:
+            chunk = bytes(src.buf[start:end])
+            fn = cipher.decrypt_blocks if decrypt else cipher.encrypt_blocks
+            dst.buf[start:end] = fn(chunk)
+    finally:
+        src.close()
+        dst.close()
+    return end - start
+
+
+class ParallelCipher:
+    """
+    Bọc một lớp cipher (AES, DES, TripleDES, ...) để mã hóa ECB song song
+    ----------------------------------------
+    - Process pool được giữ lại giữa các lần gọi (tạo khi cần)
+    - segment_size: kích thước mỗi đoạn giao cho 1 process (làm tròn theo khối)
+    - inline_threshold: dưới ngưỡng này xử lý ngay trong process hiện tại
+    - Padding PKCS chỉ xử lý ở khối cuối, trong process cha
+
+        with ParallelCipher(TripleDES, key) as pc:
+            ct = pc.encrypt(data)
+    """
+
+    def __init__(self, cipher_cls, key: bytes, workers: int = None,
+                 segment_size: int = 1 << 20, inline_threshold: int = 1 << 18):
+        self.cipher_cls = cipher_cls
+        self.key = key
+        self.block_size = cipher_cls.block_size
+        self.workers = workers or os.cpu_count() or 1
+        self.segment_size = max(self.block_size, segment_size - segment_size % self.block_size)
+        self.inline_threshold = inline_threshold
+        self.cipher = cipher_cls(key)
+        self._pool = None
+
+    # -----------------------------
+    # POOL
+    # -----------------------------
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -----------------------------
+    # XỬ LÝ SONG SONG
+    # -----------------------------
+
+    def _run(self, data, length, out_size, decrypt):
+        """
+        ECB thô trên data[:length] qua process pool.
+        Trả về shm_out – người gọi ghi phần đuôi rồi close/unlink shm_out.
+        """
+        shm_in = shared_memory.SharedMemory(create=True, size=max(length, 1))
+        shm_out = shared_memory.SharedMemory(create=True, size=max(out_size, 1))
+        try:
+            shm_in.buf[:length] = memoryview(data)[:length]
+            pool = self._get_pool()
+            futures = [
+                pool.submit(
+                    _segment_worker, self.cipher_cls, self.key,
+                    shm_in.name, shm_out.name,
+                    start, min(start + self.segment_size, length), decrypt,
+                )
+                for start in range(0, length, self.segment_size)
+            ]
+            for f in futures:
+                f.result()
+        except BaseException:
+            shm_out.close()
+            shm_out.unlink()
+            raise
+        finally:
+            shm_in.close()
+            shm_in.unlink()
+        return shm_out
+
+    def encrypt(self, data: bytes) -> bytes:
+        bs = self.block_size
+        n = len(data)
+        if n < self.inline_threshold:
+            return self.cipher.encrypt(data)
+
+        full = n - n % bs
+        pad_len = bs - n % bs
+        total = full + bs
+        shm_out = self._run(data, full, total, decrypt=False)
+        try:
+            tail = bytes(memoryview(data)[full:]) + bytes([pad_len] * pad_len)
+            shm_out.buf[full:total] = self.cipher.encrypt_block(tail)
+            return bytes(shm_out.buf[:total])
+        finally:
+            shm_out.close()
+            shm_out.unlink()
+
+    def decrypt(self, data: bytes) -> bytes:
+        bs = self.block_size
+        n = len(data)
+        if n < self.inline_threshold:
+            return self.cipher.decrypt(data)
+        if n % bs:
+            raise ValueError(f"Dữ liệu không phải bội số {bs} bytes")
+
+        shm_out = self._run(data, n, n, decrypt=True)
+        try:
+            out = shm_out.buf
+            pad_len = out[n - 1]
+            if pad_len < 1 or pad_len > bs or out[n - pad_len:n] != bytes([pad_len] * pad_len):
+                raise ValueError("Invalid padding")
+            return bytes(out[:n - pad_len])
+        finally:
+            shm_out.close()
+            shm_out.unlink()
@@ -0,0 +1,300 @@
+# =====================================================
+# PROFILING THEO PRIMITIVE / GIAI ĐOẠN (TÙY CHỌN)
+# =====================================================
+# Đếm số lần gọi và tổng nano giây cho từng primitive và từng giai đoạn.
+# Engine đang dùng: AESTTable.encrypt_block, AESNumpy.encrypt_blocks,
+# des._crypt_block / _rounds / _ip / _fp, bitslice_crypt / _bs_des /
+# _bs_sbox, TripleDES._ede, _mgf1, pow, ... Các primitive của bản tham
+# chiếu (aes.sub_bytes, mix_columns, des.permute, DESReference._feistel)
+# chỉ có số liệu khi chạy engine "reference". Giai đoạn:
+#   keysetup – tạo key schedule / sinh khóa
+#   padding  – pad/unpad, OAEP encode/decode
+#   blocks   – vòng lặp xử lý khối và các primitive bên trong
+#   output   – ghép kết quả (matrix2bytes, pack, untranspose, to_bytes)
+#
+# Khi tắt: không có wrapper nào, code gốc chạy nguyên vẹn (chi phí = 0).
+# Khi bật: thay tạm các hàm/method trong module bằng wrapper đo thời gian.
+#
+#   with profiling.profile() as prof:
+#       aes.encrypt(data, key)
+#   prof.dump("aes.json")            # JSON
+#   prof.dump("aes.folded")          # collapsed stack cho flamegraph.pl
+#
+# Hoặc đặt CRYPTO_PROFILE=1 (CRYPTO_PROFILE_OUT=file để ghi khi thoát).
+# Lưu ý: chỉ đo trong process hiện tại – worker của process pool không
+# được đo. Wrapper làm tăng thời gian của primitive rất nhỏ; dùng số liệu
+# để so sánh tương đối giữa các điểm nóng.
+
+import builtins
+import functools
+import importlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+
+# (module, thuộc tính, giai đoạn) – "Lớp.method" để bọc method
+# Giai đoạn None: kế thừa giai đoạn của frame cha
+_TARGETS = [
+    # AES
+    ("crypto.aes", "key_expansion", "keysetup"),
+    ("crypto.aes", "_pack_block", "output"),
+    ("crypto.aes", "pad", "padding"),
+    ("crypto.aes", "unpad", "padding"),
+    ("crypto.aes", "AES.__init__", "keysetup"),
+    ("crypto.aes", "AES.encrypt", None),
+    ("crypto.aes", "AES.decrypt", None),
+    ("crypto.aes", "AES.encrypt_blocks", "blocks"),
+    ("crypto.aes", "AES.decrypt_blocks", "blocks"),
+    ("crypto.aes", "AESTTable.__init__", "keysetup"),
+    ("crypto.aes", "AESTTable.encrypt_block", "blocks"),
+    ("crypto.aes", "AESTTable.decrypt_block", "blocks"),
+    ("crypto.aes", "AESNumpy.__init__", "keysetup"),
+    ("crypto.aes", "AESNumpy.encrypt_blocks", "blocks"),
+    ("crypto.aes", "AESNumpy.decrypt_blocks", "blocks"),
+    # AES – chỉ lớp AES tham chiếu gọi các primitive này
+    ("crypto.aes", "sub_bytes", "blocks"),
+    ("crypto.aes", "inv_sub_bytes", "blocks"),
+    ("crypto.aes", "shift_rows", "blocks"),
+    ("crypto.aes", "inv_shift_rows", "blocks"),
+    ("crypto.aes", "mix_columns", "blocks"),
+    ("crypto.aes", "inv_mix_columns", "blocks"),
+    ("crypto.aes", "add_round_key", "blocks"),
+    ("crypto.aes", "matrix2bytes", "output"),
+    # DES (SP-box từng khối + bitsliced)
+    ("crypto.des", "_key_schedule", "keysetup"),
+    ("crypto.des", "_crypt_block", "blocks"),
+    ("crypto.des", "_ip", "blocks"),
+    ("crypto.des", "_fp", "blocks"),
+    ("crypto.des", "_rounds", "blocks"),
+    ("crypto.des", "bitslice_crypt", "blocks"),
+    ("crypto.des", "_bs_transpose", "blocks"),
+    ("crypto.des", "_bs_des", "blocks"),
+    ("crypto.des", "_bs_sbox", "blocks"),
+    ("crypto.des", "_bs_untranspose", "output"),
+    ("crypto.des", "pad", "padding"),
+    ("crypto.des", "unpad", "padding"),
+    ("crypto.des", "DES.__init__", "keysetup"),
+    ("crypto.des", "DES.encrypt", None),
+    ("crypto.des", "DES.decrypt", None),
+    ("crypto.des", "DES.encrypt_blocks", "blocks"),
+    ("crypto.des", "DES.decrypt_blocks", "blocks"),
+    # DES – chỉ DESReference (bản chuỗi bit) gọi các primitive này
+    ("crypto.des", "permute", "blocks"),
+    ("crypto.des", "xor", "blocks"),
+    ("crypto.des", "sbox_substitution", "blocks"),
+    ("crypto.des", "DESReference.__init__", "keysetup"),
+    ("crypto.des", "DESReference._feistel", "blocks"),
+    ("crypto.des", "DESReference.encrypt", None),
+    ("crypto.des", "DESReference.decrypt", None),
+    ("crypto.des", "DESReference.encrypt_blocks", "blocks"),
+    ("crypto.des", "DESReference.decrypt_blocks", "blocks"),
+    # TripleDES (pad/unpad/bitslice_crypt được import theo tên vào module)
+    ("crypto.tripledes", "pad", "padding"),
+    ("crypto.tripledes", "unpad", "padding"),
+    ("crypto.tripledes", "bitslice_crypt", "blocks"),
+    ("crypto.tripledes", "TripleDES.__init__", "keysetup"),
+    ("crypto.tripledes", "TripleDES._ede", "blocks"),
+    ("crypto.tripledes", "TripleDES.encrypt", None),
+    ("crypto.tripledes", "TripleDES.decrypt", None),
+    ("crypto.tripledes", "TripleDES.encrypt_blocks", "blocks"),
+    ("crypto.tripledes", "TripleDES.decrypt_blocks", "blocks"),
+    # Chế độ hoạt động
+    ("crypto.modes", "pad", "padding"),
+    ("crypto.modes", "unpad", "padding"),
+    ("crypto.modes", "xor_bytes", "output"),
+    # RSA-OAEP (pow là builtin – bọc bằng biến toàn cục của module; giai
+    # đoạn theo nơi gọi: Miller-Rabin → keysetup, vòng lặp chunk → blocks)
+    ("crypto.rsa_oaep", "pow", None),
+    ("crypto.rsa_oaep", "RSA_OAEP.generate_keys", "keysetup"),
+    ("crypto.rsa_oaep", "RSA_OAEP._generate_prime", "keysetup"),
+    ("crypto.rsa_oaep", "RSA_OAEP._is_prime", "keysetup"),
+    ("crypto.rsa_oaep", "generate_prime", "keysetup"),
+    ("crypto.rsa_oaep", "_sieve_window", "keysetup"),
+    ("crypto.rsa_oaep", "_miller_rabin", "keysetup"),
+    ("crypto.rsa_oaep", "RSA_OAEP._mgf1", "padding"),
+    ("crypto.rsa_oaep", "RSA_OAEP._oaep_encode", "padding"),
+    ("crypto.rsa_oaep", "RSA_OAEP._oaep_decode", "padding"),
+    ("crypto.rsa_oaep", "RSA_OAEP._int_to_bytes", "output"),
+    ("crypto.rsa_oaep", "RSA_OAEP._private_op", "blocks"),
+    ("crypto.rsa_oaep", "RSA_OAEP.encrypt", "blocks"),
+    ("crypto.rsa_oaep", "RSA_OAEP.decrypt", "blocks"),
+]
+
+_MISSING = object()
+
+
+class Profiler:
+    """
+    Bộ đếm: số lần gọi, thời gian gồm cả con (total) và riêng (self)
+    cho mỗi primitive, tổng theo giai đoạn và theo call stack
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = {}     # tên -> [số lần, total_ns, self_ns]
+            self.phases = {}    # giai đoạn -> ns
+            self.stacks = {}    # "a;b;c" -> self_ns
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _wrap(self, name, phase, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            stack = self._stack()
+            frame_phase = phase or (stack[-1][1] if stack else "other")
+            frame = [name, frame_phase, 0]          # tên, giai đoạn, ns của con
+            stack.append(frame)
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter_ns() - start
+                stack.pop()
+                self_ns = elapsed - frame[2]
+                if stack:
+                    stack[-1][2] += elapsed
+                path = ";".join(f[0] for f in stack) + (";" if stack else "") + name
+                with self._lock:
+                    c = self.calls.get(name)
+                    if c is None:
+                        c = self.calls[name] = [0, 0, 0]
+                    c[0] += 1
+                    c[1] += elapsed
+                    c[2] += self_ns
+                    self.phases[frame_phase] = self.phases.get(frame_phase, 0) + self_ns
+                    self.stacks[path] = self.stacks.get(path, 0) + self_ns
+        return wrapper
+
+    # -----------------------------
+    # XUẤT KẾT QUẢ
+    # -----------------------------
+
+    def report(self) -> dict:
+        with self._lock:
+            primitives = {
+                name: {"calls": c[0], "total_ns": c[1], "self_ns": c[2]}
+                for name, c in sorted(self.calls.items(), key=lambda kv: -kv[1][2])
+            }
+            return {"primitives": primitives, "phases": dict(self.phases)}
+
+    def collapsed(self) -> str:
+        """Định dạng collapsed stack (flamegraph.pl, speedscope): 'a;b;c ns'"""
+        with self._lock:
+            return "".join(f"{path} {ns}\n" for path, ns in sorted(self.stacks.items()))
+
+    def dump(self, path: str):
+        """Ghi ra file: .folded/.collapsed → collapsed stack, còn lại → JSON"""
+        with open(path, "w") as f:
+            if path.endswith((".folded", ".collapsed")):
+                f.write(self.collapsed())
+            else:
+                json.dump(self.report(), f, indent=2)
+
+    def summary(self, limit: int = 20) -> str:
+        report = self.report()
+        lines = [f"{'primitive':<40}{'calls':>10}{'self ms':>12}{'total ms':>12}"]
+        for name, s in list(report["primitives"].items())[:limit]:
+            lines.append(f"{name:<40}{s['calls']:>10}{s['self_ns'] / 1e6:>12.3f}{s['total_ns'] / 1e6:>12.3f}")
+        lines.append("phases: " + ", ".join(
+            f"{p}={ns / 1e6:.3f} ms" for p, ns in sorted(report["phases"].items())
+        ))
+        return "\n".join(lines)
+
+
+# -----------------------------
+# BẬT / TẮT
+# -----------------------------
+
+_active = None
+_patches = []       # (đối tượng, thuộc tính, giá trị gốc hoặc _MISSING)
+
+
+def _resolve(module, attr):
+    """Trả về (đối tượng chứa, tên thuộc tính, giá trị hiện tại, giá trị gốc)"""
+    owner = module
+    if "." in attr:
+        cls_name, attr = attr.split(".")
+        owner = getattr(module, cls_name)
+    original = owner.__dict__.get(attr, _MISSING)
+    current = original
+    if current is _MISSING:
+        current = getattr(builtins, attr)
+    return owner, attr, current, original
+
+
+def enable(profiler: Profiler = None) -> Profiler:
+    """
+    Cài wrapper đo thời gian vào các primitive. Trả về profiler đang dùng.
+    """
+    global _active
+    if _active is not None:
+        raise RuntimeError("Profiling đang bật")
+    profiler = profiler or Profiler()
+    for module_name, attr, phase in _TARGETS:
+        module = importlib.import_module(module_name)
+        owner, name, current, original = _resolve(module, attr)
+        label = f"{module_name.split('.')[-1]}.{attr}"
+        setattr(owner, name, profiler._wrap(label, phase, current))
+        _patches.append((owner, name, original))
+    _active = profiler
+    return profiler
+
+
+def disable() -> Profiler:
+    """Gỡ toàn bộ wrapper, trả về profiler vừa dùng (None nếu chưa bật)"""
+    global _active
+    while _patches:
+        owner, name, original = _patches.pop()
+        if original is _MISSING:
+            delattr(owner, name)
+        else:
+            setattr(owner, name, original)
+    profiler, _active = _active, None
+    return profiler
+
+
+def active() -> Profiler:
+    return _active
+
+
+@contextmanager
+def profile(profiler: Profiler = None):
+    """
+    with profile() as prof: ...  – chỉ đo trong khối with
+    """
+    prof = enable(profiler)
+    try:
+        yield prof
+    finally:
+        disable()
+
+
+def _enable_from_env(out_path=None):
+    """
+    Dùng khi CRYPTO_PROFILE=1: bật ngay, ghi kết quả khi thoát
+    (ra out_path nếu có, không thì in bảng tóm tắt ra stderr)
+    """
+    import atexit
+    import sys
+
+    prof = enable()
+
+    def _finish():
+        if out_path:
+            prof.dump(out_path)
+        else:
+            print(prof.summary(), file=sys.stderr)
+
+    atexit.register(_finish)
+    return prof
@@ -0,0 +1,306 @@
+# =====================================================
+# REGISTRY CÁC ENGINE MÃ HÓA
+# =====================================================
+# Ánh xạ tên thuật toán → các engine (import lười khi cần) kèm thông tin:
+# kích thước khối, độ dài khóa, chế độ hỗ trợ, hỗ trợ dạng luồng.
+# autotune() chạy benchmark ngắn ở vài kích thước dữ liệu và chọn engine
+# nhanh nhất cho từng khoảng kích thước. Autotune chạy lười ở lần
+# encrypt/decrypt đầu tiên (tắt bằng CRYPTO_AUTOTUNE=0), không làm chậm
+# lúc import. app.py chỉ cần gọi registry.encrypt/decrypt.
+
+import importlib
+import os
+import threading
+import time
+
+
+class Engine:
+    """
+    Một cài đặt cụ thể của thuật toán
+    target: "module:Tên" – chỉ import khi lần đầu dùng tới
+    requires: các module bên ngoài cần có (vd. numpy)
+    reference: bản gốc, chỉ dùng để đối chiếu – không tham gia autotune
+    min_size: chưa autotune thì chỉ chọn engine cho dữ liệu từ cỡ này trở lên
+    """
+
+    def __init__(self, name, target, block_size=None, key_sizes=(), modes=("ecb",),
+                 streaming=False, requires=(), reference=False, min_size=0):
+        self.name = name
+        self.target = target
+        self.block_size = block_size
+        self.key_sizes = tuple(key_sizes)
+        self.modes = tuple(modes)
+        self.streaming = streaming
+        self.requires = tuple(requires)
+        self.reference = reference
+        self.min_size = min_size
+        self._factory = None
+
+    def available(self) -> bool:
+        for mod in self.requires:
+            try:
+                importlib.import_module(mod)
+            except ImportError:
+                return False
+        return True
+
+    @property
+    def factory(self):
+        if self._factory is None:
+            module, attr = self.target.split(":")
+            self._factory = getattr(importlib.import_module(module), attr)
+        return self._factory
+
+    def capabilities(self) -> dict:
+        return {
+            "engine": self.name,
+            "block_size": self.block_size,
+            "key_sizes": list(self.key_sizes),
+            "modes": list(self.modes),
+            "streaming": self.streaming,
+            "available": self.available(),
+            "reference": self.reference,
+            "min_size": self.min_size,
+        }
+
+
+class Algorithm:
+    """
+    Một thuật toán với danh sách engine
+    keyless: thuật toán không nhận khóa từ form (RSA dùng cặp khóa đã lưu)
+    selected: kết quả autotune – [(kích thước tối thiểu, tên engine), ...]
+    """
+
+    def __init__(self, name, aliases=(), keyless=False):
+        self.name = name
+        self.aliases = tuple(aliases)
+        self.keyless = keyless
+        self.engines = {}
+        self.selected = None
+
+    def add(self, engine: Engine):
+        self.engines[engine.name] = engine
+        return engine
+
+    def engine(self, name: str = None, size: int = None) -> Engine:
+        """
+        size: độ dài dữ liệu sắp xử lý (None = dữ liệu lớn / không rõ)
+        """
+        if name is not None:
+            try:
+                engine = self.engines[name]
+            except KeyError:
+                raise ValueError(f"Engine '{name}' không có cho {self.name}")
+            if not engine.available():
+                raise ValueError(f"Engine '{name}' thiếu thư viện: {', '.join(engine.requires)}")
+            return engine
+        if self.selected is not None:
+            chosen = self.selected[0][1]
+            for min_size, engine_name in self.selected:
+                if size is None or size >= min_size:
+                    chosen = engine_name
+            return self.engines[chosen]
+        # Chưa autotune: engine khả dụng cuối cùng (không phải bản tham chiếu)
+        # có min_size phù hợp với size
+        candidates = [e for e in self.engines.values() if e.available() and not e.reference]
+        if not candidates:
+            candidates = [e for e in self.engines.values() if e.available()]
+        fitting = [e for e in candidates if size is None or size >= e.min_size]
+        return (fitting or candidates)[-1]
+
+
+_ALGORITHMS = {}
+_ALIASES = {}
+
+
+def register(algorithm: Algorithm) -> Algorithm:
+    _ALGORITHMS[algorithm.name] = algorithm
+    _ALIASES[algorithm.name] = algorithm.name
+    for alias in algorithm.aliases:
+        _ALIASES[alias] = algorithm.name
+    return algorithm
+
+
+def get(name: str) -> Algorithm:
+    try:
+        return _ALGORITHMS[_ALIASES[(name or "").lower()]]
+    except KeyError:
+        raise ValueError("Thuật toán chưa được hỗ trợ")
+
+
+def algorithms():
+    return list(_ALGORITHMS)
+
+
+def capabilities() -> dict:
+    return {
+        name: {
+            "aliases": list(alg.aliases),
+            "selected": alg.selected or alg.engine().name,
+            "engines": [e.capabilities() for e in alg.engines.values()],
+        }
+        for name, alg in _ALGORITHMS.items()
+    }
+
+
+# -----------------------------
+# CÁC THUẬT TOÁN CÓ SẴN
+# -----------------------------
+
+_BLOCK_MODES = ("ecb", "cbc", "cfb", "ofb", "ctr")
+
+_aes = register(Algorithm("aes"))
+_aes.add(Engine("reference", "crypto.aes:AES", 16, (16,), _BLOCK_MODES, True, reference=True))
+_aes.add(Engine("ttable", "crypto.aes:AESTTable", 16, (16,), _BLOCK_MODES, True))
+# min_size = crypto.aes.NUMPY_THRESHOLD: dưới ngưỡng này T-table nhanh hơn
+_aes.add(Engine("numpy", "crypto.aes:AESNumpy", 16, (16,), _BLOCK_MODES, True, requires=("numpy",),
+                min_size=4096))
+
+_aes_ctr = register(Algorithm("aes-ctr"))
+_aes_ctr.add(Engine("ctr", "crypto.aes_ctr:AESCTR", 16, (16,), ("ctr",)))
+
+_aes_gcm = register(Algorithm("aes-gcm"))
+_aes_gcm.add(Engine("gcm", "crypto.aes_gcm:AESGCM", 16, (16,), ("gcm",)))
+
+_aes_xts = register(Algorithm("aes-xts"))
+_aes_xts.add(Engine("xts", "crypto.aes_xts:AESXTS", 16, (32,), ("xts",)))
+
+_aes_auth = register(Algorithm("aes-auth"))
+_aes_auth.add(Engine("hmac", "crypto.authstream:AESAuthStream", 16, (16,), ("auth",), True))
+
+_des = register(Algorithm("des"))
+_des.add(Engine("reference", "crypto.des:DESReference", 8, (8,), _BLOCK_MODES, True, reference=True))
+_des.add(Engine("spbox", "crypto.des:DES", 8, (8,), _BLOCK_MODES, True))
+
+_tdes = register(Algorithm("tripledes", aliases=("3des", "triple-des")))
+_tdes.add(Engine("fused", "crypto.tripledes:TripleDES", 8, (16, 24), _BLOCK_MODES, True))
+
+_rsa = register(Algorithm("rsa", aliases=("rsa-oaep",), keyless=True))
+_rsa.add(Engine("oaep", "crypto.rsa_oaep:RSA_OAEP", None, (), ("oaep",)))
+
+
+# -----------------------------
+# AUTOTUNE
+# -----------------------------
+
+# Mỗi kích thước mẫu đại diện cho khoảng [kích thước đó, mẫu kế tiếp)
+SAMPLE_SIZES = (64, 1024, 4096, 16384)
+
+_tuned = False
+_tune_lock = threading.Lock()
+
+
+def autotune(sample_sizes=SAMPLE_SIZES, repeats: int = 2) -> dict:
+    """
+    Đo thời gian mã hóa từng kích thước mẫu cho mỗi engine khả dụng
+    (bỏ qua bản tham chiếu) và chọn engine nhanh nhất cho từng khoảng
+    kích thước – dữ liệu nhỏ vẫn dùng engine nhanh với dữ liệu nhỏ.
+    Trả về {thuật toán: {kích thước: {engine: giây}}}.
+    """
+    global _tuned
+    report = {}
+    for alg in _ALGORITHMS.values():
+        candidates = [e for e in alg.engines.values() if e.available() and not e.reference]
+        if len(candidates) < 2:
+            if candidates:
+                alg.selected = [(0, candidates[0].name)]
+            continue
+        ciphers = {e.name: e.factory(os.urandom(e.key_sizes[0])) for e in candidates}
+        tiers = []
+        report[alg.name] = {}
+        for i, size in enumerate(sorted(sample_sizes)):
+            data = os.urandom(size)
+            timings = {}
+            for name, cipher in ciphers.items():
+                best = None
+                for _ in range(repeats):
+                    t = time.perf_counter()
+                    cipher.encrypt(data)
+                    elapsed = time.perf_counter() - t
+                    best = elapsed if best is None else min(best, elapsed)
+                timings[name] = best
+            winner = min(timings, key=timings.get)
+            if not tiers or tiers[-1][1] != winner:
+                tiers.append((0 if i == 0 else size, winner))
+            report[alg.name][size] = timings
+        alg.selected = tiers
+    _tuned = True
+    return report
+
+
+def _ensure_tuned():
+    """Autotune một lần ở lần dùng đầu tiên (trừ khi CRYPTO_AUTOTUNE=0)"""
+    if _tuned or os.environ.get("CRYPTO_AUTOTUNE", "1") == "0":
+        return
+    with _tune_lock:
+        if not _tuned:
+            autotune()
+
+
+# -----------------------------
+# DISPATCH (dùng cho app.py)
+# -----------------------------
+
+def _key_bytes(alg, engine, key):
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+    if key is None or (engine.key_sizes and len(key) not in engine.key_sizes):
+        sizes = " hoặc ".join(str(k) for k in engine.key_sizes)
+        raise ValueError(f"{alg.name.upper()} yêu cầu key dài {sizes} bytes")
+    return key
+
+
+def _run(name, data, key, mode, engine_name, decrypt):
+    alg = get(name)
+    if engine_name is None and not alg.keyless:
+        _ensure_tuned()
+    engine = alg.engine(engine_name, len(data))
+
+    if alg.keyless:
+        module = importlib.import_module(engine.target.split(":")[0])
+        return module.decrypt(data) if decrypt else module.encrypt(data)
+
+    key = _key_bytes(alg, engine, key)
+    mode = (mode or engine.modes[0]).lower()
+    if mode not in engine.modes:
+        raise ValueError(f"{alg.name.upper()} không hỗ trợ chế độ {mode}")
+
+    from .keycache import cached_cipher
+
+    if "ecb" not in engine.modes:
+        # Lớp tự quản lý chế độ (GCM, XTS, CTR riêng)
+        cipher = engine.factory(key)
+        return cipher.decrypt(data) if decrypt else cipher.encrypt(data)
+
+    with cached_cipher(engine.factory, key) as cipher:
+        if mode == "ecb":
+            return cipher.decrypt(data) if decrypt else cipher.encrypt(data)
+        from . import modes
+        m = modes.new(cipher, mode)
+        return m.decrypt(data) if decrypt else m.encrypt(data)
+
+
+def encrypt(name: str, data: bytes, key=None, mode: str = None, engine: str = None,
+            compress: int = 0) -> bytes:
+    """
+    Mã hóa data bằng thuật toán name (engine đã chọn nếu không chỉ định)
+    compress: mức nén trước khi mã hóa (0 = tắt, xem crypto/compression.py)
+    """
+    if compress:
+        from .compression import compress as _compress
+        data = _compress(data, compress)
+    return _run(name, data, key, mode, engine, decrypt=False)
+
+
+def decrypt(name: str, data: bytes, key=None, mode: str = None, engine: str = None,
+            decompress: bool = False) -> bytes:
+    """
+    decompress: giải nén sau khi giải mã (dữ liệu đã mã hóa với compress)
+    Chủ động chọn như compress – không đoán theo nội dung, vì plaintext
+    chưa nén cũng có thể bắt đầu bằng MAGIC
+    """
+    data = _run(name, data, key, mode, engine, decrypt=True)
+    if decompress:
+        from .compression import decompress as _decompress
+        data = _decompress(data)
+    return data
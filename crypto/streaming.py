@@ -0,0 +1,83 @@
+# =====================================================
+# MÃ HÓA / GIẢI MÃ DẠNG LUỒNG (update / finalize)
+# Dùng chung cho AES, DES, TripleDES (chế độ ECB + PKCS#5/#7)
+# =====================================================
+
+
+class Encryptor:
+    """
+    Ngữ cảnh mã hóa tăng dần
+    ----------------------------------------
+    - update(chunk): nhận chunk bất kỳ kích thước, trả về các khối đã mã hóa
+    - finalize(): padding phần dư cuối cùng và trả về khối cuối
+
+    Chỉ giữ lại phần dư < 1 khối trong bộ đệm.
+    Kết quả nối lại giống hệt cipher.encrypt(toàn bộ dữ liệu).
+    """
+
+    def __init__(self, cipher):
+        self._cipher = cipher
+        self._block_size = cipher.block_size
+        self._buf = bytearray()
+        self._done = False
+
+    def update(self, data: bytes) -> bytes:
+        if self._done:
+            raise ValueError("Encryptor đã finalize")
+        buf = self._buf
+        buf += data
+        n = len(buf) - len(buf) % self._block_size
+        if not n:
+            return b""
+        out = self._cipher.encrypt_blocks(bytes(buf[:n]))
+        del buf[:n]
+        return out
+
+    def finalize(self) -> bytes:
+        if self._done:
+            raise ValueError("Encryptor đã finalize")
+        self._done = True
+        out = self._cipher.encrypt(bytes(self._buf))   # padding phần dư
+        self._buf.clear()
+        return out
+
+
+class Decryptor:
+    """
+    Ngữ cảnh giải mã tăng dần
+    ----------------------------------------
+    Luôn giữ lại khối cuối cùng trong bộ đệm vì chỉ khi finalize()
+    mới biết khối nào chứa padding.
+    """
+
+    def __init__(self, cipher):
+        self._cipher = cipher
+        self._block_size = cipher.block_size
+        self._buf = bytearray()
+        self._done = False
+
+    def update(self, data: bytes) -> bytes:
+        if self._done:
+            raise ValueError("Decryptor đã finalize")
+        buf = self._buf
+        buf += data
+        n = len(buf) - len(buf) % self._block_size
+        if n == len(buf):
+            n -= self._block_size          # giữ lại khối cuối
+        if n <= 0:
+            return b""
+        out = self._cipher.decrypt_blocks(bytes(buf[:n]))
+        del buf[:n]
+        return out
+
+    def finalize(self) -> bytes:
+        if self._done:
+            raise ValueError("Decryptor đã finalize")
+        self._done = True
+        if len(self._buf) != self._block_size:
+            raise ValueError(
+                f"Dữ liệu không phải bội số {self._block_size} bytes"
+            )
+        out = self._cipher.decrypt(bytes(self._buf))   # unpad khối cuối
+        self._buf.clear()
+        return out
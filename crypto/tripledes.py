@@ -4,8 +4,13 @@
 # =====================================================
 
 from .des import DES, pad, unpad  # import DES và hàm padding/unpadding
+from .des import bitslice_crypt, BITSLICE_THRESHOLD
+from .des import _rounds, _ip, _fp
+from .streaming import Encryptor, Decryptor
+from .buffers import BufferMixin
+from .keycache import cached_cipher
 
-class TripleDES:
+class TripleDES(BufferMixin):
     """
     Triple DES (3DES)
     ----------------------------------------
@@ -24,6 +29,8 @@ class TripleDES:
         - 24 byte  → 3DES 3-key (K1, K2, K3)
     """
 
+    block_size = 8
+
     def __init__(self, key: bytes):
         # Kiểm tra độ dài khóa hợp lệ
         if len(key) not in (16, 24):
@@ -39,10 +46,24 @@ class TripleDES:
             k2 = key[8:16]
             k3 = key[16:24]
 
-        # Khởi tạo 3 đối tượng DES
+        # Khởi tạo 3 đối tượng DES (K3 == K1 → dùng chung 1 key schedule)
         self.des1 = DES(k1)
         self.des2 = DES(k2)
-        self.des3 = DES(k3)
+        self.des3 = self.des1 if k3 == k1 else DES(k3)
+
+    # -----------------------------
+    # LÕI EDE GỘP
+    # -----------------------------
+    # FP ở cuối lần DES trước và IP ở đầu lần DES sau triệt tiêu nhau,
+    # nên chỉ cần IP 1 lần, 48 vòng liên tiếp trên 2 nửa 32-bit, FP 1 lần.
+    # Giữa 2 lần DES chỉ còn lại bước hoán đổi 2 nửa.
+
+    def _ede(self, block, k1, k2, k3):
+        x = _ip(int.from_bytes(block, "big"))
+        left, right = _rounds(x >> 32, x & 0xFFFFFFFF, k1)
+        left, right = _rounds(right, left, k2)
+        left, right = _rounds(right, left, k3)
+        return _fp((right << 32) | left).to_bytes(8, "big")
 
     # -----------------------------
     # MÃ HÓA 1 KHỐI 64-BIT
@@ -52,10 +73,12 @@ class TripleDES:
         """
         Mã hóa 1 khối 8 byte theo mô hình EDE
         """
-        block = self.des1.encrypt_block(block)   # E(K1)
-        block = self.des2.decrypt_block(block)   # D(K2)
-        block = self.des3.encrypt_block(block)   # E(K3)
-        return block
+        return self._ede(
+            block,
+            self.des1.round_keys,        # E(K1)
+            self.des2.inv_round_keys,    # D(K2)
+            self.des3.round_keys,        # E(K3)
+        )
 
     # -----------------------------
     # GIẢI MÃ 1 KHỐI 64-BIT
@@ -65,31 +88,83 @@ class TripleDES:
         """
         Giải mã 1 khối 8 byte (ngược lại quá trình mã hóa)
         """
-        block = self.des3.decrypt_block(block)   # D(K3)
-        block = self.des2.encrypt_block(block)   # E(K2)
-        block = self.des1.decrypt_block(block)   # D(K1)
-        return block
+        return self._ede(
+            block,
+            self.des3.inv_round_keys,    # D(K3)
+            self.des2.round_keys,        # E(K2)
+            self.des1.inv_round_keys,    # D(K1)
+        )
 
     # -----------------------------
     # CHẾ ĐỘ ECB VỚI PADDING PKCS#5
     # -----------------------------
 
+    def encrypt_blocks(self, data: bytes) -> bytes:
+        """
+        ECB thô (không padding) – len(data) phải là bội số 8
+        """
+        if len(data) % 8:
+            raise ValueError("Dữ liệu không phải bội số 8 bytes")
+        if len(data) >= BITSLICE_THRESHOLD:
+            # Bitsliced: 3 lần DES chạy liên tiếp trên dữ liệu đã chuyển vị
+            return bitslice_crypt(data, [
+                self.des1.round_keys, self.des2.inv_round_keys, self.des3.round_keys
+            ])
+        return b"".join(self.encrypt_block(data[i:i+8]) for i in range(0, len(data), 8))
+
+    def decrypt_blocks(self, data: bytes) -> bytes:
+        if len(data) % 8:
+            raise ValueError("Dữ liệu không phải bội số 8 bytes")
+        if len(data) >= BITSLICE_THRESHOLD:
+            return bitslice_crypt(data, [
+                self.des3.inv_round_keys, self.des2.round_keys, self.des1.inv_round_keys
+            ])
+        return b"".join(self.decrypt_block(data[i:i+8]) for i in range(0, len(data), 8))
+
     def encrypt(self, data: bytes) -> bytes:
         """
         Mã hóa dữ liệu theo chế độ ECB với padding PKCS#5
         """
-        data = pad(data)
-        result = b""
-        for i in range(0, len(data), 8):
-            block = data[i:i+8]
-            result += self.encrypt_block(block)
-        return result
+        return self.encrypt_blocks(pad(data))
 
     def decrypt(self, data: bytes) -> bytes:
         """
         Giải mã dữ liệu theo chế độ ECB với unpad PKCS#5
         """
-        result = b""
-        for i in range(0, len(data), 8):
-            result += self.decrypt_block(data[i:i+8])
-        return unpad(result)
+        return unpad(self.decrypt_blocks(data))
+
+    # -----------------------------
+    # DẠNG LUỒNG (update / finalize)
+    # -----------------------------
+
+    def encryptor(self) -> Encryptor:
+        """Ngữ cảnh mã hóa dạng luồng – không cần giữ toàn bộ dữ liệu"""
+        return Encryptor(self)
+
+    def decryptor(self) -> Decryptor:
+        """Ngữ cảnh giải mã dạng luồng – không cần giữ toàn bộ dữ liệu"""
+        return Decryptor(self)
+
+
+# =================================================
+# MODULE-LEVEL API (PHÙ HỢP app.py)
+# =================================================
+
+def encrypt(data: bytes, key: str) -> bytes:
+    """
+    Hàm này được app.py gọi
+    """
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+    with cached_cipher(TripleDES, key) as cipher:
+        return cipher.encrypt(data)
+
+
+def decrypt(data: bytes, key: str) -> bytes:
+    """
+    Hàm này được app.py gọi
+    """
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+    with cached_cipher(TripleDES, key) as cipher:
+        return cipher.decrypt(data)
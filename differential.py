@@ -0,0 +1,352 @@
+# differential.py
+# =====================================================
+# KIỂM TRA CHÉO CÁC ENGINE TỐI ƯU VỚI CÀI ĐẶT THAM CHIẾU
+# =====================================================
+# - Vector chuẩn FIPS / NIST (known-answer)
+# - Dữ liệu ngẫu nhiên + trường hợp biên: rỗng, đúng bội số khối,
+#   mọi độ dài padding, buffer lớn
+# - Mọi engine và mọi chế độ trong crypto.registry
+# - Bảng tốc độ mỗi engine so với bản tham chiếu
+#
+# Chạy:  python differential.py [--seed N] [--large 1048576] [--json out.json]
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+
+from crypto import registry, modes
+import crypto.aes as aes_mod
+from crypto.des import DESReference
+
+
+# -----------------------------
+# THAM CHIẾU 3DES (ghép từ DESReference)
+# -----------------------------
+
+class ReferenceTripleDES:
+    """3DES EDE từng bước bằng DESReference – dùng làm chuẩn đối chiếu"""
+    block_size = 8
+
+    def __init__(self, key):
+        k1, k2 = key[:8], key[8:16]
+        k3 = key[16:24] if len(key) == 24 else k1
+        self.d1, self.d2, self.d3 = DESReference(k1), DESReference(k2), DESReference(k3)
+
+    def encrypt_block(self, block):
+        return self.d3.encrypt_block(self.d2.decrypt_block(self.d1.encrypt_block(block)))
+
+    def decrypt_block(self, block):
+        return self.d1.decrypt_block(self.d2.encrypt_block(self.d3.decrypt_block(block)))
+
+    def encrypt(self, data):
+        return modes.ECB(self).encrypt(data)
+
+    def decrypt(self, data):
+        return modes.ECB(self).decrypt(data)
+
+
+def reference_factory(alg):
+    """Lớp tham chiếu cho thuật toán (engine reference hoặc 3DES ghép)"""
+    if alg.name == "tripledes":
+        return ReferenceTripleDES
+    ref = [e for e in alg.engines.values() if e.reference]
+    return ref[0].factory if ref else None
+
+
+# -----------------------------
+# KNOWN-ANSWER VECTORS
+# -----------------------------
+
+@contextmanager
+def standard_aes_schedule():
+    """
+    crypto.aes.AES cộng round key theo thứ tự chuyển vị so với FIPS-197
+    (giữ nguyên để tương thích file đã mã hóa). Để kiểm tra các vòng AES
+    với vector chuẩn, tạm thời chuyển vị key schedule về thứ tự chuẩn.
+    """
+    original = aes_mod.key_expansion
+    aes_mod.key_expansion = lambda key: [[list(r) for r in zip(*rk)] for rk in original(key)]
+    try:
+        yield
+    finally:
+        aes_mod.key_expansion = original
+
+
+H = bytes.fromhex
+
+DES_KAT = [
+    # FIPS 46-3 ví dụ mẫu
+    (H("133457799BBCDFF1"), H("0123456789ABCDEF"), H("85E813540F0AB405")),
+    (H("0E329232EA6D0D73"), H("8787878787878787"), H("0000000000000000")),
+]
+
+TDES_KAT = [
+    # NIST SP 800-67 ví dụ
+    (H("0123456789ABCDEF23456789ABCDEF01456789ABCDEF0123"),
+     b"The qufck brown fox jump",
+     H("A826FD8CE53B855FCCE21C8112256FE668D5C05DD9B6B900")),
+]
+
+AES_KAT = [
+    # FIPS-197 phụ lục C.1
+    (H("000102030405060708090a0b0c0d0e0f"),
+     H("00112233445566778899aabbccddeeff"),
+     H("69c4e0d86a7b0430d8cdb78070b4c55a")),
+]
+
+GCM_KAT = [
+    # NIST GCM test case 3 và 4
+    (H("feffe9928665731c6d6a8f9467308308"), H("cafebabefacedbaddecaf888"),
+     H("d9313225f88406e5a55909c5aff5269a86a7a9531534f7da2e4c303d8a318a72"
+       "1c3c0c95956809532fcf0e2449a6b525b16aedf5aa0de657ba637b391aafd255"), b"",
+     H("42831ec2217774244b7221b784d0d49ce3aa212f2c02a4e035c17e2329aca12e"
+       "21d514b25466931c7d8f6a5aac84aa051ba30b396a0aac973d58e091473f5985"),
+     H("4d5c2af327cd64a62cf35abd2ba6fab4")),
+    (H("feffe9928665731c6d6a8f9467308308"), H("cafebabefacedbaddecaf888"),
+     H("d9313225f88406e5a55909c5aff5269a86a7a9531534f7da2e4c303d8a318a72"
+       "1c3c0c95956809532fcf0e2449a6b525b16aedf5aa0de657ba637b39"),
+     H("feedfacedeadbeeffeedfacedeadbeefabaddad2"),
+     H("42831ec2217774244b7221b784d0d49ce3aa212f2c02a4e035c17e2329aca12e"
+       "21d514b25466931c7d8f6a5aac84aa051ba30b396a0aac973d58e091"),
+     H("5bc94fbc3221a5db94fae95ae7121a47")),
+]
+
+XTS_KAT = [
+    # IEEE 1619 vector 1
+    (bytes(32), 0, bytes(32),
+     H("917cf69ebd68b2ec9b9fe9a3eadda692cd43d2f59598ed858c02c2652fbf922e")),
+]
+
+
+class Report:
+    def __init__(self):
+        self.checks = 0
+        self.mismatches = []
+        self.speed = []
+
+    def check(self, label, got, expected):
+        self.checks += 1
+        if got != expected:
+            self.mismatches.append(label)
+            print(f"  ✗ {label}")
+
+    def check_raises(self, label, fn, exc=ValueError):
+        """fn() phải ném exc (vd. ciphertext bị cắt cụt)"""
+        try:
+            fn()
+        except exc:
+            self.check(label, True, True)
+        else:
+            self.check(label, False, True)
+
+
+def run_kats(report):
+    print("Known-answer vectors")
+    for name in ("des", "tripledes"):
+        alg = registry.get(name)
+        vectors = DES_KAT if name == "des" else TDES_KAT
+        factories = {e.name: e.factory for e in alg.engines.values() if e.available()}
+        factories["reference"] = reference_factory(alg)
+        for ename, factory in factories.items():
+            for i, (key, pt, ct) in enumerate(vectors):
+                c = factory(key)
+                got = b"".join(c.encrypt_block(pt[j:j + 8]) for j in range(0, len(pt), 8))
+                report.check(f"KAT {name}/{ename} #{i} encrypt", got, ct)
+                back = b"".join(c.decrypt_block(ct[j:j + 8]) for j in range(0, len(ct), 8))
+                report.check(f"KAT {name}/{ename} #{i} decrypt", back, pt)
+
+    with standard_aes_schedule():
+        for e in registry.get("aes").engines.values():
+            if not e.available():
+                continue
+            for i, (key, pt, ct) in enumerate(AES_KAT):
+                c = e.factory(key)
+                report.check(f"KAT aes/{e.name} #{i} encrypt", c.encrypt_block(pt), ct)
+                report.check(f"KAT aes/{e.name} #{i} decrypt", c.decrypt_block(ct), pt)
+                report.check(f"KAT aes/{e.name} #{i} encrypt_blocks", c.encrypt_blocks(pt * 3), ct * 3)
+
+        from crypto.aes_gcm import AESGCM
+        from crypto.aes_xts import AESXTS
+        for i, (key, iv, pt, aad, ct, tag) in enumerate(GCM_KAT):
+            g = AESGCM(key, cipher=aes_mod.AESTTable(key))
+            report.check(f"KAT aes-gcm #{i} seal", g.seal(iv, pt, aad), (ct, tag))
+        for i, (key, sector, pt, ct) in enumerate(XTS_KAT):
+            report.check(f"KAT aes-xts #{i}", AESXTS(key, 512).encrypt_sector(sector, pt), ct)
+
+
+# -----------------------------
+# NGẪU NHIÊN + TRƯỜNG HỢP BIÊN
+# -----------------------------
+
+def lengths_for(bs, large):
+    sizes = {0, 1, bs - 1, bs, bs + 1, 2 * bs, 1024, 4096 + 3}
+    sizes.update(3 * bs + r for r in range(bs))      # mọi độ dài padding
+    if large:
+        sizes.update({large, large + 1})
+    return sorted(sizes)
+
+
+def run_block_engines(report, rng, large):
+    print("Engine vs tham chiếu (ECB/CBC/CFB/OFB/CTR, streaming, encrypt_into)")
+    for name in ("aes", "des", "tripledes"):
+        alg = registry.get(name)
+        ref_cls = reference_factory(alg)
+        for engine in alg.engines.values():
+            if not engine.available() or engine.reference:
+                continue
+            for key_size in engine.key_sizes:
+                key = rng.randbytes(key_size)
+                ref, fast = ref_cls(key), engine.factory(key)
+                bs = engine.block_size
+                for n in lengths_for(bs, large):
+                    data = rng.randbytes(n)
+                    # Bản tham chiếu chậm: chỉ chạy buffer lớn cho ECB
+                    mode_list = engine.modes if n < 8192 else ("ecb",)
+                    for mode in mode_list:
+                        iv = rng.randbytes(bs)
+                        label = f"{name}/{engine.name} k{key_size} {mode} n={n}"
+                        want = modes.new(ref, mode, iv=iv).encrypt(data)
+                        got = modes.new(fast, mode, iv=iv).encrypt(data)
+                        report.check(label + " encrypt", got, want)
+                        report.check(label + " decrypt", modes.new(fast, mode).decrypt(want), data)
+                    if n >= 8192:
+                        continue
+                    label = f"{name}/{engine.name} k{key_size} n={n}"
+                    want = ref.encrypt(data)
+                    report.check(label + " encrypt()", fast.encrypt(data), want)
+
+                    enc = fast.encryptor()
+                    step = rng.randint(1, 3 * bs)
+                    out = b"".join(enc.update(data[i:i + step]) for i in range(0, n, step)) + enc.finalize()
+                    report.check(label + " streaming", out, want)
+
+                    dst = bytearray(n + bs)
+                    written = fast.encrypt_into(data, dst)
+                    report.check(label + " encrypt_into", bytes(dst[:written]), want)
+
+
+def run_stream_modes(report, rng, large):
+    print("AES-CTR / GCM / XTS (khứ hồi + đối chiếu keystream)")
+    from crypto.aes_ctr import AESCTR
+    from crypto.aes_gcm import AESGCM
+    from crypto.aes_xts import AESXTS
+    ref_aes = aes_mod.AES
+    for n in lengths_for(16, large):
+        data = rng.randbytes(n)
+        key = rng.randbytes(16)
+        ctr = AESCTR(key)
+        ct = ctr.encrypt(data)
+        if n < 8192:
+            ref = ref_aes(key)
+            blocks = -(-n // 16)
+            stream = b"".join(ref.encrypt_block(ct[:8] + i.to_bytes(8, "big")) for i in range(blocks))
+            report.check(f"aes-ctr n={n} keystream", ct[8:], bytes(a ^ b for a, b in zip(data, stream)))
+        report.check(f"aes-ctr n={n} decrypt", AESCTR(key, nonce=ct[:8]).decrypt(ct), data)
+        if n > 3:
+            off = n // 3
+            report.check(f"aes-ctr n={n} decrypt_at", ctr.decrypt_at(ct[8 + off:], off, ct[:8]), data[off:])
+        report.check(f"aes-ctr n={n} nonce mới mỗi lần", ctr.encrypt(data)[:8] != ct[:8], True)
+
+        g = AESGCM(key)
+        report.check(f"aes-gcm n={n} decrypt", g.decrypt(g.encrypt(data, b"aad"), b"aad"), data)
+
+        if n >= 16:
+            x = AESXTS(rng.randbytes(32), sector_size=512)
+            report.check(f"aes-xts n={n} decrypt", x.decrypt(x.encrypt(data)), data)
+
+
+# -----------------------------
+# CIPHERTEXT BỊ CẮT CỤT
+# -----------------------------
+
+def run_truncated(report, rng):
+    print("Ciphertext bị cắt cụt phải bị từ chối")
+    for name in ("des", "tripledes"):
+        alg = registry.get(name)
+        for engine in alg.engines.values():
+            if not engine.available() or engine.reference:
+                continue
+            c = engine.factory(rng.randbytes(engine.key_sizes[0]))
+            bs = engine.block_size
+            for n in (3 * bs, 500 * bs):
+                ct = c.encrypt(rng.randbytes(n))[:-3]
+                label = f"{name}/{engine.name} cắt cụt n={len(ct)}"
+                report.check_raises(label + " decrypt_blocks", lambda: c.decrypt_blocks(ct))
+                report.check_raises(label + " decrypt", lambda: c.decrypt(ct))
+
+    from crypto.des import bitslice_crypt, _key_schedule
+    schedule = [_key_schedule(rng.randbytes(8))]
+    for n in (4003, 4096 * 8 + 1):
+        report.check_raises(f"bitslice_crypt n={n}", lambda: bitslice_crypt(bytes(n), schedule))
+
+
+# -----------------------------
+# BẢNG TỐC ĐỘ
+# -----------------------------
+
+def run_speed(report, size):
+    print(f"\nTốc độ (ECB, {size} bytes) so với tham chiếu")
+    data = os.urandom(size)
+    for name in ("aes", "des", "tripledes"):
+        alg = registry.get(name)
+        ref_cls = reference_factory(alg)
+        key = os.urandom(next(iter(alg.engines.values())).key_sizes[0])
+        t = time.perf_counter()
+        ref_cls(key).encrypt(data)
+        ref_time = time.perf_counter() - t
+        for engine in alg.engines.values():
+            if not engine.available() or engine.reference:
+                continue
+            t = time.perf_counter()
+            engine.factory(key).encrypt(data)
+            elapsed = time.perf_counter() - t
+            row = {
+                "algorithm": name,
+                "engine": engine.name,
+                "seconds": elapsed,
+                "reference_seconds": ref_time,
+                "speedup": ref_time / elapsed if elapsed else float("inf"),
+            }
+            report.speed.append(row)
+            print(f"  {name:<10} {engine.name:<10} {elapsed * 1000:9.2f} ms"
+                  f"   ref {ref_time * 1000:9.2f} ms   x{row['speedup']:.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Differential test các engine mã hóa")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--large", type=int, default=1 << 14,
+                        help="kích thước buffer lớn (bytes), 0 để bỏ qua")
+    parser.add_argument("--speed-size", type=int, default=1 << 14)
+    parser.add_argument("--json", help="ghi kết quả ra file JSON")
+    args = parser.parse_args(argv)
+
+    seed = args.seed if args.seed is not None else random.randrange(1 << 32)
+    rng = random.Random(seed)
+    print(f"seed = {seed}")
+
+    report = Report()
+    run_kats(report)
+    run_block_engines(report, rng, args.large)
+    run_stream_modes(report, rng, args.large)
+    run_truncated(report, rng)
+    run_speed(report, args.speed_size)
+
+    print(f"\n{report.checks} kiểm tra, {len(report.mismatches)} sai khác")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "seed": seed,
+                "checks": report.checks,
+                "mismatches": report.mismatches,
+                "speed": report.speed,
+            }, f, indent=2)
+    return 1 if report.mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
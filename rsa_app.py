@@ -49,6 +49,7 @@ def generate_keys():
         
         # Tạo instance mới với key_size
         rsa_crypto.key_size = key_size
+        rsa_crypto.primes = int(request.form.get("primes", 2))
         rsa_crypto.generate_keys()
         rsa_crypto.save_keys()
         
@@ -115,7 +116,7 @@ def import_private_key():
         key_json = json.loads(key_data)
         
         # Set private key
-        rsa_crypto.private_key = (key_json['d'], key_json['n'])
+        rsa_crypto.set_private_key(key_json)
         rsa_crypto.key_size = key_json['key_size']
         
         # Lưu vào file
@@ -228,7 +229,7 @@ def decrypt():
             
             try:
                 key_json = json.loads(private_key_data)
-                rsa_crypto.private_key = (key_json['d'], key_json['n'])
+                rsa_crypto.set_private_key(key_json)
                 rsa_crypto.key_size = key_json['key_size']
             except:
                 return jsonify({
@@ -245,7 +246,7 @@ def decrypt():
             
             with open(rsa_crypto.private_key_file, 'r') as f:
                 key_json = json.load(f)
-                rsa_crypto.private_key = (key_json['d'], key_json['n'])
+                rsa_crypto.set_private_key(key_json)
                 rsa_crypto.key_size = key_json['key_size']
         
         # Lấy file
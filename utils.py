@@ -7,9 +7,26 @@ def read_file(file_storage):
     return file_storage.read()
 
 
-def write_file(filename, data):
+def write_file(filename, data, manifest=False):
+    """
+    manifest=True: ghi kèm sidecar Merkle "<filename>.merkle.json",
+    băm trong cùng lượt ghi (xem crypto/integrity.py)
+    """
+    if not manifest:
+        with open(filename, "wb") as f:
+            f.write(data)
+        return
+
+    from crypto.integrity import TreeHasher, sidecar_path
+
+    hasher = TreeHasher()
+    view = memoryview(data)
     with open(filename, "wb") as f:
-        f.write(data)
+        for i in range(0, len(view), hasher.chunk_size):
+            chunk = view[i:i + hasher.chunk_size]
+            f.write(chunk)
+            hasher.update(chunk)
+    hasher.finalize().save(sidecar_path(filename))
 
 
 def pkcs7_pad(data):